@@ -1,77 +1,273 @@
+#-------------------------------------------------------------------------------
+
+""" Create the overview pdf of the deviation test plots.
+    The plots are found in the output manifests of the validation runs (or by
+    scanning the pdf directories if there is no manifest). Each category
+    (process, energy, chirality and coordinate) gets its own small latex
+    document, the documents are compiled in parallel and only if their latex
+    code or one of their plots changed. The overview document
+    CreateDeviationOverview.tex then only needs to join the category pdfs.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import concurrent.futures
+import json
+import logging as log
+import os
+import subprocess
+import sys
+
+#-------------------------------------------------------------------------------
+
+# Directory of this script, the latex documents are compiled from here
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+manifest_name = "manifest.json"
+
+# Plot types shown in the overview, the deviation plots are shown next to each
+# other for each deviation direction
+cut_effect_type = "CutEffect"
+deviation_types = ["DevCutCut0", "DevParCut0", "DevParCut"]
+
+# Preamble of each category document
+category_preamble = """\\input{../Base/PresentationHeader.tex}
+
+\\newcommand{\\thirdfraction}{0.32}%
+\\newcommand{\\alonefraction}{0.7}%
+\\newcommand{\\halffraction}{0.48}%
+
+"""
+
+#-------------------------------------------------------------------------------
+
+def manifest_plots(plots_dir):
+  """ Paths of the pdf plots recorded in the manifest of the plots directory
+      (in the order they were written by each stage and input file), None if
+      there is no readable manifest.
+  """
+  manifest_path = os.path.join(plots_dir, manifest_name)
+  if not os.path.isfile(manifest_path):
+    return None
+  try:
+    with open(manifest_path, "r") as manifest_file:
+      entries = json.load(manifest_file)["outputs"]
+  except (OSError, ValueError, KeyError, TypeError) as error:
+    log.warning("Unreadable manifest {} ({}), scanning the pdf directories".format(manifest_path, error))
+    return None
+  names = sorted(entries, key=lambda name: (entries[name]["stage"], entries[name]["input"], entries[name]["order"]))
+  return [os.path.join(plots_dir, name) for name in names if name.endswith(".pdf")]
+
+def scanned_plots(plots_dir):
+  """ Paths of all pdf plots in the pdf directory of the plots directory.
+  """
+  plot_paths = []
+  for plot_type in [cut_effect_type] + deviation_types:
+    type_dir = os.path.join(plots_dir, "pdf", plot_type)
+    if os.path.isdir(type_dir):
+      plot_paths += sorted(entry.path for entry in os.scandir(type_dir) if entry.name.endswith(".pdf"))
+  return plot_paths
+
+def find_plots(plots_dir):
+  """ Paths of all existing pdf plots of the plots directory, taken from the
+      manifest if there is one. Plots of the manifest that don't exist are
+      reported and left out.
+  """
+  plot_paths = manifest_plots(plots_dir)
+  if plot_paths is None:
+    log.info("No manifest in {}, scanning the pdf directories".format(plots_dir))
+    plot_paths = scanned_plots(plots_dir)
+  missing = [plot_path for plot_path in plot_paths if not os.path.isfile(plot_path)]
+  for plot_path in missing:
+    log.warning("Plot {} of the manifest doesn't exist".format(plot_path))
+  if plot_paths and len(missing) == len(plot_paths):
+    log.error("None of the {} plots of {} exist".format(len(plot_paths), plots_dir))
+  return [os.path.abspath(plot_path) for plot_path in plot_paths if os.path.isfile(plot_path)]
+
+#-------------------------------------------------------------------------------
+
+def classify_plot(plot_path):
+  """ Category, plot type and deviation direction of the plot (direction None
+      for the cut effect plots), None for plots not shown in the overview.
+  """
+  plot_type = os.path.basename(os.path.dirname(plot_path))
+  name = os.path.splitext(os.path.basename(plot_path))[0]
+  if plot_type == cut_effect_type and name.endswith("_" + cut_effect_type):
+    return name[:-len(cut_effect_type)-1], plot_type, None
+  if plot_type in deviation_types:
+    category, separator, direction = name.partition("_{}_".format(plot_type))
+    if separator and not direction.startswith("ScatterOnly_"):
+      return category, plot_type, direction
+  return None
+
+def collect_categories(plot_paths):
+  """ Plots of each category, as dictionary of the plot paths for each plot
+      type and direction. Categories and directions keep the order of the
+      given plots.
+  """
+  categories = {}
+  for plot_path in plot_paths:
+    classification = classify_plot(plot_path)
+    if classification is None:
+      continue
+    category, plot_type, direction = classification
+    category_plots = categories.setdefault(category, {})
+    if category_plots.get((plot_type, direction), plot_path) != plot_path:
+      log.warning("Multiple {} plots for {}, using {}".format(plot_type, category, plot_path))
+    category_plots[(plot_type, direction)] = plot_path
+  return categories
+
+#-------------------------------------------------------------------------------
+
+def frame(plot_paths, width):
+  """ Latex code of a frame showing the given plots next to each other.
+  """
+  lines = ["\\begin{frame}", "\\begin{center}"]
+  lines += ["\\includegraphics[width={}\\textwidth]{{{}}}".format(width, plot_path) for plot_path in plot_paths]
+  lines += ["\\end{center}", "\\end{frame}", "", ""]
+  return "\n".join(lines)
+
+def category_document(category_plots):
+  """ Latex document with all frames of one category: the cut effect plots
+      followed by the deviation plots of each direction.
+  """
+  frames = []
+  if (cut_effect_type, None) in category_plots:
+    frames.append(frame([category_plots[(cut_effect_type, None)]], "\\alonefraction"))
+
+  directions = []
+  for _, direction in category_plots:
+    if direction is not None and direction not in directions:
+      directions.append(direction)
+  for direction in directions:
+    plot_paths = [category_plots[(plot_type, direction)] for plot_type in deviation_types if (plot_type, direction) in category_plots]
+    frames.append(frame(plot_paths, "\\thirdfraction"))
+
+  return category_preamble + "\\begin{document}\n\n" + "".join(frames) + "\\end{document}\n"
+
+#-------------------------------------------------------------------------------
+
+def write_if_changed(file_path, content):
+  """ Write the file only if its content changed, so that its modification
+      time shows when it last changed.
+      Returns whether the file was written.
+  """
+  if os.path.isfile(file_path):
+    with open(file_path, "r") as old_file:
+      if old_file.read() == content:
+        return False
+  with open(file_path, "w") as new_file:
+    new_file.write(content)
+  return True
+
+def is_outdated(target_path, source_paths):
+  """ Check if the target file is missing or older than any of its sources.
+  """
+  if not os.path.isfile(target_path):
+    return True
+  target_mtime = os.stat(target_path).st_mtime_ns
+  return any(os.stat(source_path).st_mtime_ns > target_mtime for source_path in source_paths)
+
+def compile_latex(tex_path, pdflatex="pdflatex"):
+  """ Compile the latex document (relative to the script directory) into a pdf
+      next to it.
+      Returns the path of the pdf, raises a RuntimeError if the compilation
+      fails.
+  """
+  output_dir = os.path.dirname(tex_path) or "."
+  command = [pdflatex, "-interaction=nonstopmode", "-halt-on-error", "-output-directory", output_dir, tex_path]
+  log.debug("Running {}".format(" ".join(command)))
+  try:
+    process = subprocess.run(command, cwd=script_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+  except OSError as error:
+    raise RuntimeError("Could not run {}: {}".format(pdflatex, error))
+  if process.returncode != 0:
+    log_path = os.path.splitext(tex_path)[0] + ".log"
+    raise RuntimeError("Compiling {} failed, see {}".format(tex_path, os.path.join(script_dir, log_path)))
+  return os.path.splitext(tex_path)[0] + ".pdf"
+
+#-------------------------------------------------------------------------------
+
+def build_overview(plots_dirs, build_dir="build", workers=None, pdflatex="pdflatex", compile_pdfs=True):
+  """ Write the latex documents of all categories and the frames file of the
+      overview, then compile the outdated category documents in parallel and
+      the overview if any category changed.
+      Returns the number of failed compilations.
+  """
+  plot_paths = []
+  for plots_dir in plots_dirs:
+    plot_paths += find_plots(plots_dir)
+  categories = collect_categories(plot_paths)
+  log.info("Found {} plots in {} categories".format(len(plot_paths), len(categories)))
+  if not categories:
+    log.error("No deviation test plots found in {}".format(", ".join(plots_dirs)))
+    return 1
+
+  os.makedirs(os.path.join(script_dir, build_dir), exist_ok=True)
+  outdated = []
+  category_pdfs = []
+  for category, category_plots in categories.items():
+    tex_path = os.path.join(build_dir, "{}.tex".format(category))
+    write_if_changed(os.path.join(script_dir, tex_path), category_document(category_plots))
+    pdf_path = os.path.splitext(tex_path)[0] + ".pdf"
+    category_pdfs.append(pdf_path)
+    sources = [os.path.join(script_dir, tex_path)] + list(category_plots.values())
+    if is_outdated(os.path.join(script_dir, pdf_path), sources):
+      outdated.append(tex_path)
+
+  # The overview document includes the frames file, which joins all categories
+  frames = "".join("\\includepdf[pages=-]{{{}}}\n".format(pdf_path) for pdf_path in category_pdfs)
+  write_if_changed(os.path.join(script_dir, "Frames.tex"), frames)
+  if not compile_pdfs:
+    return 0
+
+  log.info("Compiling {} of {} category documents".format(len(outdated), len(categories)))
+  n_failed = 0
+  with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+    futures = [executor.submit(compile_latex, tex_path, pdflatex) for tex_path in outdated]
+    for future in concurrent.futures.as_completed(futures):
+      try:
+        future.result()
+      except RuntimeError as error:
+        log.error(error)
+        n_failed += 1
+  if n_failed > 0:
+    return n_failed
+
+  overview_tex = "CreateDeviationOverview.tex"
+  overview_sources = [os.path.join(script_dir, path) for path in [overview_tex, "Frames.tex"] + category_pdfs]
+  if is_outdated(os.path.join(script_dir, "CreateDeviationOverview.pdf"), overview_sources):
+    log.info("Compiling the overview")
+    try:
+      compile_latex(overview_tex, pdflatex)
+    except RuntimeError as error:
+      log.error(error)
+      return 1
+  return 0
+
+#-------------------------------------------------------------------------------
+
 def main():
-  """ Create a file with latex code that produce frames with all the plots 
-      from the deviation tests.
+  """ Create the deviation overview from the plots of the given plots
+      directories.
   """
+  log.basicConfig(level=log.INFO, format="%(message)s") # Set logging level
+  parser = argparse.ArgumentParser(description="Create the overview pdf of the deviation test plots.")
+  parser.add_argument("plots_dirs", nargs="+", help="Plots directories of the validation runs (containing manifest.json and pdf/).")
+  parser.add_argument("-b", "--build-dir", default="build",
+                      help="Directory (relative to this script) of the category documents.")
+  parser.add_argument("-j", "--workers", type=int, default=None,
+                      help="Number of parallel latex compilations (default: number of CPUs).")
+  parser.add_argument("--pdflatex", default="pdflatex", help="Latex compiler command.")
+  parser.add_argument("--no-compile", action="store_true",
+                      help="Only write the latex files without compiling them.")
+  args = parser.parse_args()
+
+  n_failed = build_overview(args.plots_dirs, args.build_dir, args.workers, args.pdflatex, not args.no_compile)
+  sys.exit(1 if n_failed > 0 else 0)
 
-  # Deviation directions that were testest
-  dev_dir_list = [
-    "center_only",
-    "width_only",
-    "lower_edge_only",
-    "upper_edge_only" ]
-  
-  # Difermion sub-categories that were tested
-  difermion_list = [
-    "2f_mu_180to275_250_eLpR_costh_f_star",
-    "2f_mu_180to275_250_eRpL_costh_f_star",
-    "2f_mu_81to101_FZ_250_eLpR_costh_f_star",
-    "2f_mu_81to101_FZ_250_eRpL_costh_f_star",
-    "2f_mu_81to101_BZ_250_eLpR_costh_f_star",
-    "2f_mu_81to101_BZ_250_eRpL_costh_f_star" ]
-  
-  # WW sub-categories that were tested
-  ww_list = [
-    "WW_muminus_250_eLpR_costh_Wminus_star",
-    "WW_muminus_250_eLpR_costh_l_star",
-    "WW_muminus_250_eLpR_phi_l_star",
-    "WW_muminus_250_eRpL_costh_Wminus_star",
-    "WW_muminus_250_eRpL_costh_l_star",
-    "WW_muminus_250_eRpL_phi_l_star",
-    "WW_muplus_250_eLpR_costh_Wminus_star",
-    "WW_muplus_250_eLpR_costh_l_star",
-    "WW_muplus_250_eLpR_phi_l_star",
-    "WW_muplus_250_eRpL_costh_Wminus_star",
-    "WW_muplus_250_eRpL_costh_l_star",
-    "WW_muplus_250_eRpL_phi_l_star" ]
-    
-  # Open a latex file and write the frames
-  latex_file = open("Frames.tex", "w+")
-  
-  for difermion_base in difermion_list:
-    latex_file.write("\\begin{frame}\n")
-    latex_file.write("\\begin{center}\n")
-    latex_file.write("\\includegraphics[width=\\alonefraction\\textwidth]{{\\DifermionPath/CutEffect/{}_CutEffect.pdf}}\n".format(difermion_base))
-    latex_file.write("\\end{center}\n")
-    latex_file.write("\\end{frame}\n\n")
-    
-    for dev_dir in dev_dir_list:
-      latex_file.write("\\begin{frame}\n")
-      latex_file.write("\\begin{center}\n")
-      latex_file.write("\\includegraphics[width=\\thirdfraction\\textwidth]{{\\DifermionPath/DevCutCut0/{}_DevCutCut0_{}.pdf}}\n".format(difermion_base,dev_dir))
-      latex_file.write("\\includegraphics[width=\\thirdfraction\\textwidth]{{\\DifermionPath/DevParCut0/{}_DevParCut0_{}.pdf}}\n".format(difermion_base,dev_dir))
-      latex_file.write("\\includegraphics[width=\\thirdfraction\\textwidth]{{\\DifermionPath/DevParCut/{}_DevParCut_{}.pdf}}\n".format(difermion_base,dev_dir))
-      latex_file.write("\\end{center}\n")
-      latex_file.write("\\end{frame}\n\n")
-  
-  for ww_base in ww_list:
-    latex_file.write("\\begin{frame}\n")
-    latex_file.write("\\begin{center}\n")
-    latex_file.write("\\includegraphics[width=\\alonefraction\\textwidth]{{\\WWPath/CutEffect/{}_CutEffect.pdf}}\n".format(ww_base))
-    latex_file.write("\\end{center}\n")
-    latex_file.write("\\end{frame}\n\n")
-    
-    for dev_dir in dev_dir_list:
-      latex_file.write("\\begin{frame}\n")
-      latex_file.write("\\begin{center}\n")
-      latex_file.write("\\includegraphics[width=\\thirdfraction\\textwidth]{{\\WWPath/DevCutCut0/{}_DevCutCut0_{}.pdf}}\n".format(ww_base,dev_dir))
-      latex_file.write("\\includegraphics[width=\\thirdfraction\\textwidth]{{\\WWPath/DevParCut0/{}_DevParCut0_{}.pdf}}\n".format(ww_base,dev_dir))
-      latex_file.write("\\includegraphics[width=\\thirdfraction\\textwidth]{{\\WWPath/DevParCut/{}_DevParCut_{}.pdf}}\n".format(ww_base,dev_dir))
-      latex_file.write("\\end{center}\n")
-      latex_file.write("\\end{frame}\n\n")
-  
-  latex_file.close()
-  
 #-------------------------------------------------------------------------------
-  
+
 if __name__ == "__main__":
-  main()
\ No newline at end of file
+  main()
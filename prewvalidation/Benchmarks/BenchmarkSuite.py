@@ -0,0 +1,258 @@
+#-------------------------------------------------------------------------------
+
+""" Benchmark suite of the validation processing steps (reading, direction
+    selection, chi-squared computation, plotting) on synthetic validation files
+    of several sizes.
+    Each run appends its timings to a JSON lines file together with the git
+    commit and machine, so that regressions show up in the comparison to a
+    baseline run: by default the previous run on the same machine, or the
+    latest run of a selected git commit on the same machine.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import datetime
+import json
+import logging as log
+import numpy as np
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Local modules
+from prewvalidation.Benchmarks import SyntheticData as BMSD
+from prewvalidation.IO import Reader as IOR
+from prewvalidation.ValidityMeasures import ChiSquared as VMCS
+from prewvalidation.ValidityMeasures import DeltaHelp as VMDH
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+# Benchmarked file sizes: number of bins per dimension and deviation steps
+sizes = {
+  "small": { "n_bins": (20,), "n_steps": 2 },
+  "medium": { "n_bins": (20,20), "n_steps": 3 },
+  "large": { "n_bins": (40,40), "n_steps": 4 }
+}
+
+default_results_path = "benchmark_results.jsonl"
+
+# Default relative slow-down compared to the baseline that counts as regression
+regression_threshold = 1.2
+
+#-------------------------------------------------------------------------------
+
+def best_time(function, n_repeats):
+  """ Return the best wall time out of the given number of repetitions.
+  """
+  times = []
+  for _ in range(n_repeats):
+    start = time.perf_counter()
+    function()
+    times.append(time.perf_counter() - start)
+  return min(times)
+
+def git_commit():
+  """ Current git commit of the repository (with a "-dirty" suffix if there
+      are uncommitted changes), None if it can't be determined.
+  """
+  try:
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+  return commit + ("-dirty" if status else "")
+
+def resolve_commit(ref):
+  """ Full hash of the given git commit (hash, branch or tag), the reference
+      itself if it can't be resolved (e.g. a commit not in this repository).
+  """
+  try:
+    return subprocess.run(["git", "rev-parse", "--verify", "--quiet", ref + "^{commit}"], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return ref
+
+#-------------------------------------------------------------------------------
+
+def chi_squared(reader):
+  """ Chi-squared computation of all directions as done by the chi-squared
+      test.
+  """
+  C, P = reader["C"], reader["P"]
+  deltas = reader["Deltas"]
+  d_max_selection = VMDH.delta_metric(deltas) <= 2.0 * reader["Delta"]
+  selections = np.logical_and(VMDD.selection_matrix(reader["DirLabel"]), d_max_selection)
+  return VMCS.chi_squared_test(C, P, C[reader.cut0_row()], deltas, selections)
+
+def benchmark_plotting(file_path, n_repeats):
+  """ Time the plotting stages (rendering and saving) on the given file.
+  """
+  import matplotlib
+  matplotlib.use("Agg")
+  from prewvalidation.ValidationTests import BatchDriver as VTBD
+  from prewvalidation.ValidationTests import Pipeline as VTP
+  from prewvalidation.ValidationTests import ValidationData as VTVD
+  VTBD.show_progress = False
+
+  data = VTVD.ValidationData(file_path)
+  timings = {}
+  for stage_name, stage in VTP.stages.items():
+    timings["plot_{}".format(stage_name)] = best_time(lambda: stage.run(data), n_repeats)
+  return timings
+
+def benchmark_size(size_name, work_dir, n_repeats, plotting=True):
+  """ Run all benchmarks on a synthetic file of the given size.
+  """
+  size = sizes[size_name]
+  size_dir = os.path.join(work_dir, size_name)
+  os.makedirs(size_dir, exist_ok=True)
+  file_path = BMSD.write_validation_file(os.path.join(size_dir, BMSD.file_name()), size["n_bins"], size["n_steps"])
+
+  reader = IOR.Reader(file_path, use_cache=False)
+  timings = {}
+  timings["read"] = best_time(lambda: IOR.Reader(file_path, use_cache=False), n_repeats)
+  IOR.Reader(file_path, use_cache=True) # Write the cache
+  timings["read_cached"] = best_time(lambda: IOR.Reader(file_path, use_cache=True), n_repeats)
+  timings["select"] = best_time(lambda: VMDD.add_direction_index(reader), n_repeats)
+  timings["chi_squared"] = best_time(lambda: chi_squared(reader), n_repeats)
+  if plotting:
+    timings.update(benchmark_plotting(file_path, n_repeats))
+
+  timings["file_MB"] = os.path.getsize(file_path) / 1e6
+  return timings
+
+#-------------------------------------------------------------------------------
+
+def load_runs(results_path):
+  """ Load all previous runs from the results file.
+  """
+  if not os.path.isfile(results_path):
+    return []
+  with open(results_path, "r") as results_file:
+    return [json.loads(line) for line in results_file if line.strip()]
+
+def is_commit(run_commit, commit):
+  """ Check if the commit of a run (short hash) is the given commit (full or
+      abbreviated hash). Runs with uncommitted changes don't match.
+  """
+  if not run_commit or run_commit.endswith("-dirty"):
+    return False
+  return commit.startswith(run_commit) or run_commit.startswith(commit)
+
+def baseline_run(runs, host, commit=None):
+  """ Find the run to compare with: the latest run on the same machine, of the
+      given commit if any. None if there is no such run.
+  """
+  for other in reversed(runs):
+    if other["host"] == host and (commit is None or is_commit(other["commit"], commit)):
+      return other
+  return None
+
+def compare_runs(baseline, run, threshold=regression_threshold):
+  """ Log the timings of the run relative to the baseline run and return the
+      list of (size, step) that got slower than the threshold.
+  """
+  regressions = []
+  log.info("Compared to {} ({}):".format(baseline["commit"], baseline["date"]))
+  for size_name, timings in run["results"].items():
+    baseline_timings = baseline["results"].get(size_name, {})
+    for step, t in timings.items():
+      if step == "file_MB" or step not in baseline_timings:
+        continue
+      ratio = t / baseline_timings[step]
+      flag = " <-- regression" if ratio > threshold else ""
+      log.info("  {:8s} {:20s} {:8.4f} s -> {:8.4f} s ({:5.2f}x){}".format(size_name, step, baseline_timings[step], t, ratio, flag))
+      if ratio > threshold:
+        regressions.append((size_name, step))
+  return regressions
+
+def find_baseline(results_path, baseline_commit=None):
+  """ Find the baseline run in the results file: the latest run of the given
+      commit on this machine, or without commit the previous run on this
+      machine. Raises a ValueError if there is no run of the given commit.
+  """
+  host = platform.node()
+  commit = resolve_commit(baseline_commit) if baseline_commit is not None else None
+  baseline = baseline_run(load_runs(results_path), host, commit)
+  if baseline_commit is not None and baseline is None:
+    raise ValueError("No run of commit {} on this machine ({}) in {}".format(baseline_commit, host, results_path))
+  return baseline
+
+def run_suite(size_names, n_repeats=3, plotting=True, results_path=default_results_path,
+              baseline=None, threshold=regression_threshold):
+  """ Run the benchmarks for the given sizes, append the results to the
+      results file and compare them to the baseline run (see find_baseline)
+      if given.
+      Returns the run record and the list of regressions.
+  """
+  work_dir = tempfile.mkdtemp(prefix="validation_benchmark_")
+  try:
+    results = {}
+    for size_name in size_names:
+      log.info("Benchmarking size {}".format(size_name))
+      results[size_name] = benchmark_size(size_name, work_dir, n_repeats, plotting)
+  finally:
+    shutil.rmtree(work_dir)
+
+  run = {
+    "commit": git_commit(),
+    "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    "host": platform.node(),
+    "python": platform.python_version(),
+    "repeats": n_repeats,
+    "results": results }
+
+  for size_name, timings in results.items():
+    log.info("{}:".format(size_name))
+    for step, t in timings.items():
+      log.info("  {:20s} {:8.4f}".format(step, t))
+
+  regressions = []
+  if baseline is not None:
+    regressions = compare_runs(baseline, run, threshold)
+
+  with open(results_path, "a") as results_file:
+    results_file.write(json.dumps(run, sort_keys=True) + "\n")
+  return run, regressions
+
+#-------------------------------------------------------------------------------
+
+def main():
+  """ Run the benchmark suite with the settings from the command line.
+  """
+  log.basicConfig(level=log.INFO, format="%(message)s") # Set logging level
+  parser = argparse.ArgumentParser(description="Benchmark the validation processing steps on synthetic files.")
+  parser.add_argument("--sizes", nargs="+", choices=list(sizes), default=list(sizes),
+                      help="File sizes to benchmark.")
+  parser.add_argument("-r", "--repeats", type=int, default=3,
+                      help="Number of repetitions, the best time is used.")
+  parser.add_argument("--no-plots", action="store_true",
+                      help="Skip the plotting benchmarks.")
+  parser.add_argument("-o", "--output", default=default_results_path,
+                      help="JSON lines file the results are appended to.")
+  parser.add_argument("-b", "--baseline",
+                      help="Git commit to compare to, its latest run on this machine is used (default: the previous run on this machine).")
+  parser.add_argument("-t", "--threshold", type=float, default=regression_threshold,
+                      help="Slow-down factor compared to the baseline that counts as regression.")
+  args = parser.parse_args()
+
+  try:
+    baseline = find_baseline(args.output, args.baseline)
+  except ValueError as error:
+    parser.error(str(error))
+
+  run, regressions = run_suite(args.sizes, args.repeats, not args.no_plots, args.output,
+                               baseline, args.threshold)
+  if regressions:
+    log.warning("{} regression(s) compared to the baseline run.".format(len(regressions)))
+    sys.exit(1)
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
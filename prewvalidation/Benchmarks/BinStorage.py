@@ -0,0 +1,124 @@
+#-------------------------------------------------------------------------------
+
+""" Benchmark and agreement check of the bin storage types of the reader.
+    Reads the given (or a synthetic) validation file with each bin storage
+    (see IO/Reader) and compares the parse time and the memory of the bin
+    contents, and checks that the chi-squared values of the full and of the
+    chunked evaluation agree with those of the double precision storage.
+    Exits with a non-zero status if any storage disagrees.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import logging as log
+import numpy as np
+import os
+import shutil
+import sys
+import tempfile
+
+# Local modules
+from prewvalidation.Benchmarks import BenchmarkSuite as BMS
+from prewvalidation.Benchmarks import SyntheticData as BMSD
+from prewvalidation.IO import Reader as IOR
+from prewvalidation.ValidationTests import Streaming as VTS
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+# Maximum relative deviation of the chi-squared values from the full evaluation
+# with double precision storage (the chunked evaluation sums in another order,
+# float32 keeps ~7 significant digits of the bin contents)
+max_rel_deviation = { "float64": 1e-12, "float32": 1e-4, "integer": 1e-4 }
+
+#-------------------------------------------------------------------------------
+
+def rel_deviation(results, reference):
+  """ Largest relative deviation of the chi-squared values from the reference
+      results, infinite if different points were selected.
+  """
+  if not np.array_equal(results[["direction", "row"]], reference[["direction", "row"]]):
+    return np.inf
+  deviation = 0.0
+  for name in ["chi_sq_c0", "chi_sq_pc"]:
+    scale = np.maximum(np.abs(reference[name]), np.finfo(np.float64).tiny)
+    deviation = max(deviation, np.amax(np.abs(results[name] - reference[name]) / scale, initial=0.0))
+  return deviation
+
+def streaming_results(file_path, bin_storage, chunk_rows):
+  """ Chi-squared values of the chunked evaluation with the given bin storage.
+  """
+  reader = IOR.ChunkedReader(file_path, chunk_rows, bin_storage=bin_storage)
+  results, _, _ = VTS.streaming_test(reader, 2.0 * reader["Delta"], 1.0)
+  return results
+
+def benchmark_file(file_path, n_repeats=3, chunk_rows=VTS.default_chunk_rows):
+  """ Compare all bin storages on the given file.
+      Returns a dictionary with parse time, memory and deviations of each
+      storage, storages that can't be used for the file are left out.
+  """
+  results = {}
+  reference = None
+  for bin_storage in IOR.bin_storages:
+    try:
+      reader = IOR.Reader(file_path, use_cache=False, bin_storage=bin_storage)
+    except ValueError as error:
+      log.info("  {:8s} skipped ({})".format(bin_storage, error))
+      continue
+    VMDD.add_direction_index(reader)
+    chi_squared = BMS.chi_squared(reader)
+    if reference is None:
+      reference = chi_squared
+    results[bin_storage] = {
+      "read": BMS.best_time(lambda: IOR.Reader(file_path, use_cache=False, bin_storage=bin_storage), n_repeats),
+      "bins_MB": (reader["C"].nbytes + reader["P"].nbytes) / 1e6,
+      "deviation": rel_deviation(chi_squared, reference),
+      "streaming_deviation": rel_deviation(streaming_results(file_path, bin_storage, chunk_rows), reference) }
+
+  log.info("{}:".format(os.path.basename(file_path)))
+  log.info("  {:8s} {:>10s} {:>10s} {:>12s} {:>12s}".format("", "read [s]", "bins [MB]", "max. dev.", "chunked dev."))
+  for name, result in results.items():
+    log.info("  {:8s} {:10.3f} {:10.2f} {:12.2e} {:12.2e}".format(
+      name, result["read"], result["bins_MB"], result["deviation"], result["streaming_deviation"]))
+  return results
+
+def disagreements(results):
+  """ Names of the bin storages whose chi-squared values deviate too much.
+  """
+  return [name for name, result in results.items()
+          if max(result["deviation"], result["streaming_deviation"]) > max_rel_deviation[name]]
+
+#-------------------------------------------------------------------------------
+
+def main():
+  """ Run the bin storage comparison on the given files or a synthetic file.
+  """
+  log.basicConfig(level=log.INFO, format="%(message)s") # Set logging level
+  parser = argparse.ArgumentParser(description="Compare the bin storage types of the reader and check the agreement of the chi-squared values.")
+  parser.add_argument("files", nargs="*", help="Validation files (default: synthetic file).")
+  parser.add_argument("-r", "--repeats", type=int, default=3,
+                      help="Number of repetitions, the best time is used.")
+  args = parser.parse_args()
+
+  failed = []
+  if args.files:
+    for file_path in args.files:
+      failed += disagreements(benchmark_file(file_path, args.repeats))
+  else:
+    work_dir = tempfile.mkdtemp(prefix="validation_synthetic_")
+    try:
+      size = BMS.sizes["medium"]
+      file_path = BMSD.write_validation_file(os.path.join(work_dir, BMSD.file_name()), size["n_bins"], size["n_steps"])
+      failed += disagreements(benchmark_file(file_path, args.repeats))
+    finally:
+      shutil.rmtree(work_dir)
+
+  if failed:
+    log.error("Chi-squared values disagree with the double precision storage for: {}".format(", ".join(sorted(set(failed)))))
+    sys.exit(1)
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
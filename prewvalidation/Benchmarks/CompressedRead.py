@@ -0,0 +1,107 @@
+#-------------------------------------------------------------------------------
+
+""" Benchmark of reading compressed validation files.
+    Compresses the given (or a synthetic) validation file with all available
+    compressions and compares the file size and the end-to-end load time of
+    the reader (without cache) and of the metadata-only scan to the plain text
+    file.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import bz2
+import gzip
+import logging as log
+import lzma
+import os
+import shutil
+import tempfile
+
+# Local modules
+from prewvalidation.Benchmarks import BenchmarkSuite as BMS
+from prewvalidation.Benchmarks import SyntheticData as BMSD
+from prewvalidation.IO import Compression as IOC
+from prewvalidation.IO import CSVMetadataReader as CMR
+from prewvalidation.IO import Reader as IOR
+
+#-------------------------------------------------------------------------------
+
+def compress_zstd(in_file, out_path):
+  """ Write the zstandard compressed copy of the opened file.
+  """
+  with IOC.zstandard.open(out_path, "wb") as out_file:
+    shutil.copyfileobj(in_file, out_file)
+
+def compress(file_path, suffix, work_dir):
+  """ Write a compressed copy of the file into the work directory.
+      Returns its path, None if the compression isn't available.
+  """
+  out_path = os.path.join(work_dir, os.path.basename(file_path) + suffix)
+  openers = { ".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open }
+  with open(file_path, "rb") as in_file:
+    if suffix in openers:
+      with openers[suffix](out_path, "wb") as out_file:
+        shutil.copyfileobj(in_file, out_file)
+    elif IOC.zstandard is not None:
+      compress_zstd(in_file, out_path)
+    else:
+      return None
+  return out_path
+
+def benchmark_file(file_path, n_repeats=3):
+  """ Compare the load times of all compressions of the given file.
+      Returns a dictionary with size and times of each compression.
+  """
+  results = {}
+  work_dir = tempfile.mkdtemp(prefix="validation_compression_")
+  try:
+    for suffix in [""] + list(IOC.openers):
+      path = compress(file_path, suffix, work_dir) if suffix else file_path
+      if path is None:
+        log.info("  {:6s} skipped (zstandard not installed)".format(suffix))
+        continue
+      results[suffix or "plain"] = {
+        "size_MB": os.path.getsize(path) / 1e6,
+        "read": BMS.best_time(lambda: IOR.Reader(path, use_cache=False), n_repeats),
+        "metadata": BMS.best_time(lambda: CMR.CSVMetadataReader(path), n_repeats) }
+  finally:
+    shutil.rmtree(work_dir)
+
+  plain = results["plain"]
+  log.info("{}:".format(os.path.basename(file_path)))
+  log.info("  {:6s} {:>10s} {:>10s} {:>10s} {:>10s}".format("", "size [MB]", "read [s]", "vs. plain", "meta [s]"))
+  for name, result in results.items():
+    log.info("  {:6s} {:10.2f} {:10.3f} {:10.2f} {:10.4f}".format(
+      name, result["size_MB"], result["read"], result["read"]/plain["read"], result["metadata"]))
+  return results
+
+#-------------------------------------------------------------------------------
+
+def main():
+  """ Run the compression benchmark on the given files or a synthetic file.
+  """
+  log.basicConfig(level=log.INFO, format="%(message)s") # Set logging level
+  parser = argparse.ArgumentParser(description="Compare reading compressed validation files to plain text.")
+  parser.add_argument("files", nargs="*", help="Plain text validation files (default: synthetic file).")
+  parser.add_argument("-r", "--repeats", type=int, default=3,
+                      help="Number of repetitions, the best time is used.")
+  args = parser.parse_args()
+
+  if args.files:
+    for file_path in args.files:
+      benchmark_file(file_path, args.repeats)
+    return
+
+  work_dir = tempfile.mkdtemp(prefix="validation_synthetic_")
+  try:
+    size = BMS.sizes["medium"]
+    file_path = BMSD.write_validation_file(os.path.join(work_dir, BMSD.file_name()), size["n_bins"], size["n_steps"])
+    benchmark_file(file_path, args.repeats)
+  finally:
+    shutil.rmtree(work_dir)
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,92 @@
+#-------------------------------------------------------------------------------
+
+""" Benchmark of the read throughput of the validation file reader.
+    Compares the single-pass reader against the previous approach, which opened
+    each file twice (metadata scan + pandas parsing) and used eval to interpret
+    the array metadata.
+"""
+
+#-------------------------------------------------------------------------------
+
+import logging as log
+import numpy as np
+import os
+import pandas as pd
+import sys
+import time
+
+# Local modules
+from prewvalidation.IO import CSVMetadataReader as CMR
+from prewvalidation.IO import Reader as IOR
+
+#-------------------------------------------------------------------------------
+
+def read_two_pass(file_path):
+  """ Reference implementation of the previous reading approach.
+      (Only used for comparison, eval must not be used in the actual reader.)
+  """
+  mr = CMR.CSVMetadataReader()
+  data = {}
+  for line in mr.find_metadata_lines(file_path):
+    ID, data_str = line.split(":")
+    data_str = data_str.strip()
+    if ID in CMR.CSVMetadataReader.int_data:
+      data[ID] = int(float(data_str))
+    elif ID in CMR.CSVMetadataReader.float_data:
+      data[ID] = float(data_str)
+    elif ID in CMR.CSVMetadataReader.array_data:
+      data[ID] = np.array(eval(data_str))
+    else:
+      data[ID] = data_str
+  data["Data"] = pd.read_csv(file_path, header=mr.get_data_header_line())
+  return data
+
+def read_single_pass(file_path):
+  """ Current reading approach (without cache).
+  """
+  return IOR.Reader(file_path, use_cache=False).data
+
+#-------------------------------------------------------------------------------
+
+def time_read(read_function, file_path, n_repeats):
+  """ Return the best wall time out of the given number of read repetitions.
+  """
+  times = []
+  for _ in range(n_repeats):
+    start = time.perf_counter()
+    read_function(file_path)
+    times.append(time.perf_counter() - start)
+  return min(times)
+
+def benchmark_read(file_path, n_repeats=5):
+  """ Compare the read throughput of both approaches for the given file.
+  """
+  size_MB = os.path.getsize(file_path) / 1e6
+  t_two_pass = time_read(read_two_pass, file_path, n_repeats)
+  t_single_pass = time_read(read_single_pass, file_path, n_repeats)
+
+  log.info("{}:".format(os.path.basename(file_path)))
+  log.info("  file size:   {:8.2f} MB".format(size_MB))
+  log.info("  two-pass:    {:8.3f} s ({:8.2f} MB/s)".format(t_two_pass, size_MB/t_two_pass))
+  log.info("  single-pass: {:8.3f} s ({:8.2f} MB/s)".format(t_single_pass, size_MB/t_single_pass))
+  log.info("  speed-up:    {:8.2f}".format(t_two_pass/t_single_pass))
+  return t_two_pass, t_single_pass
+
+#-------------------------------------------------------------------------------
+
+def main():
+  """ Run the read benchmark on the files given on the command line.
+  """
+  log.basicConfig(level=log.INFO, format="%(message)s") # Set logging level
+
+  file_paths = sys.argv[1:]
+  if not file_paths:
+    file_paths = ["/home/jakob/Documents/DESY/MountPoints/DUSTMount/TGCAnalysis/SampleProduction/NewMCProduction/2f_Z_l/PrEWInput/validation/2f_mu_180to275_250_eLpR_valdata.csv"]
+
+  for file_path in file_paths:
+    benchmark_read(file_path)
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
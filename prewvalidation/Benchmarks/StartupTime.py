@@ -0,0 +1,175 @@
+#-------------------------------------------------------------------------------
+
+""" Benchmark of the startup time of the command line interface.
+    Runs each command with -h in a fresh python process, which measures the
+    imports needed before any file is processed, and lists the heavy
+    dependencies each command imports.
+    With --baseline the same commands of another git commit are measured for
+    comparison, also commits before the package layout, whose scripts are
+    then run directly.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import io
+import logging as log
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+# Local modules
+from prewvalidation import cli
+
+#-------------------------------------------------------------------------------
+
+# Dependencies that take long to import
+heavy_modules = ["matplotlib", "pandas", "tqdm"]
+
+# Starts the command with -h and reports the heavy modules that were imported
+startup_code = """
+import sys
+from prewvalidation import cli
+try:
+  cli.main(["prew-validation", "{command}", "-h"])
+except SystemExit:
+  pass
+sys.stderr.write("\\n" + ",".join(m for m in {modules} if m in sys.modules))
+"""
+
+# Same for a script of a tree without the package layout
+script_code = """
+import runpy, sys
+sys.argv = [{script!r}, "-h"]
+sys.path.insert(0, ".")
+try:
+  runpy.run_path({script!r}, run_name="__main__")
+except SystemExit:
+  pass
+sys.stderr.write("\\n" + ",".join(m for m in {modules} if m in sys.modules))
+"""
+
+#-------------------------------------------------------------------------------
+
+class Tree:
+  """ Class describes how the commands of a source tree are started: through
+      the command line interface of its package, or (for old trees without
+      the package layout) by running the scripts in py/ directly.
+      Without a directory the package of this process is used.
+  """
+  def __init__(self, tree_dir=None, path_dir=None):
+    self.package_dir = None
+    self.script_dir = None
+    self.env = None
+    if tree_dir is None:
+      return
+    for name in ["prewvalidation", "py"]:
+      if os.path.isfile(os.path.join(tree_dir, name, "cli.py")):
+        self.package_dir = os.path.join(tree_dir, name)
+        break
+    if self.package_dir is None:
+      self.script_dir = os.path.join(tree_dir, "py")
+      return
+    # Make the package importable under its name
+    os.symlink(self.package_dir, os.path.join(path_dir, "prewvalidation"))
+    self.env = dict(os.environ, PYTHONPATH=path_dir)
+
+  def start_args(self, command):
+    """ Python code and working directory that start the given command with
+        -h, None if the tree doesn't have the command.
+    """
+    if self.script_dir is None:
+      return startup_code.format(command=command, modules=heavy_modules), None
+    module_path = cli.commands[command][0].split(".")[1:]
+    script = "{}.py".format(module_path[-1])
+    cwd = os.path.join(self.script_dir, *module_path[:-1])
+    if not os.path.isfile(os.path.join(cwd, script)):
+      return None
+    return script_code.format(script=script, modules=heavy_modules), cwd
+
+def checkout(ref, work_dir):
+  """ Extract the files of the given git commit into the work directory.
+      Returns the tree of the commit.
+  """
+  archive = subprocess.run(["git", "archive", "--format=tar", ref], capture_output=True, check=True).stdout
+  tree_dir = os.path.join(work_dir, "tree")
+  path_dir = os.path.join(work_dir, "path")
+  os.makedirs(path_dir)
+  with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+    tar.extractall(tree_dir)
+  return Tree(tree_dir, path_dir)
+
+#-------------------------------------------------------------------------------
+
+def startup_time(command, n_repeats=5, tree=Tree()):
+  """ Best wall time of starting the command (incl. the python interpreter)
+      and the heavy modules it imported, None if the tree doesn't have the
+      command.
+  """
+  start_args = tree.start_args(command)
+  if start_args is None:
+    return None
+  code, cwd = start_args
+  times = []
+  for _ in range(n_repeats):
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=tree.env,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    times.append(time.perf_counter() - start)
+  return min(times), process.stderr.decode().splitlines()[-1].strip()
+
+def interpreter_time(n_repeats=5):
+  """ Best wall time of starting the bare python interpreter, for reference.
+  """
+  times = []
+  for _ in range(n_repeats):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    times.append(time.perf_counter() - start)
+  return min(times)
+
+#-------------------------------------------------------------------------------
+
+def format_time(result):
+  """ Startup time and heavy imports of a command for the table.
+  """
+  if result is None:
+    return "{:>8s}  {:24s}".format("-", "")
+  return "{:8.3f}  {:24s}".format(result[0], result[1] or "-")
+
+def main():
+  """ Measure the startup time of all commands.
+  """
+  log.basicConfig(level=log.INFO, format="%(message)s") # Set logging level
+  parser = argparse.ArgumentParser(description="Measure the startup time of the command line interface.")
+  parser.add_argument("commands", nargs="*", default=list(cli.commands), help="Commands to measure (default: all).")
+  parser.add_argument("-r", "--repeats", type=int, default=5,
+                      help="Number of repetitions, the best time is used.")
+  parser.add_argument("-b", "--baseline",
+                      help="Git commit to compare to (e.g. the commit before a change), run from within the repository.")
+  args = parser.parse_args()
+
+  work_dir = tempfile.mkdtemp(prefix="validation_startup_")
+  try:
+    baseline = checkout(args.baseline, work_dir) if args.baseline is not None else None
+    header = "{:12s} {:>8s}  {:24s}".format("command", "time [s]", "heavy imports")
+    if baseline is not None:
+      header += "  {:>8s}  {}".format("baseline", "heavy imports ({})".format(args.baseline))
+    log.info(header.rstrip())
+    log.info("{:12s} {:8.3f}".format("(python)", interpreter_time(args.repeats)))
+    for command in args.commands:
+      line = "{:12s} {}".format(command, format_time(startup_time(command, args.repeats)))
+      if baseline is not None:
+        line += "  {}".format(format_time(startup_time(command, args.repeats, baseline)))
+      log.info(line.rstrip())
+  finally:
+    shutil.rmtree(work_dir)
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,147 @@
+#-------------------------------------------------------------------------------
+
+""" Generator of synthetic validation files in the format read by the
+    CSVMetadataReader, so that the processing can be benchmarked without the
+    real sample files.
+    The cut efficiency is modelled as a smooth turn-on in the first coordinate
+    whose center and width shift with (delta-c, delta-w); the parametrisation
+    deviates from the cut distribution by a small random relative error.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import logging as log
+import numpy as np
+import os
+
+# Local modules
+from prewvalidation.IO import CSVMetadataReader as CMR
+
+#-------------------------------------------------------------------------------
+
+# Coordinates used for the synthetic dimensions: name, minimum, maximum
+coordinates = [
+  ("costh_f_star", -1.0, 1.0),
+  ("costh_l_star", -1.0, 1.0),
+  ("phi_l_star", -np.pi, np.pi)
+]
+
+def file_name(name="2f_mu_180to275", energy=250, e_chirality="eLpR"):
+  """ File name following the naming of the real validation files.
+  """
+  return "{}_{}_{}_valdata.csv".format(name, energy, e_chirality)
+
+def deviation_points(n_steps, delta, full_grid=True):
+  """ [delta-c, delta-w] pairs of the deviation points, either the full grid of
+      n_steps steps of size delta in each direction, or only the points along
+      the lines through the reference point (center, width, edges).
+  """
+  steps = np.arange(-n_steps, n_steps+1)
+  points = np.array([(c, w) for c in steps for w in steps], dtype=float)
+  if not full_grid:
+    on_line = (points[:,0] == 0) | (points[:,1] == 0) | (np.abs(points[:,1]) == 2*np.abs(points[:,0]))
+    points = points[on_line]
+  return points * delta
+
+def bin_centers(n_bins):
+  """ Bin centers of the regular grid with the given number of bins in each
+      dimension, shape (n_total_bins, n_dims).
+  """
+  centers = []
+  for d, n in enumerate(n_bins):
+    name, c_min, c_max = coordinates[d]
+    edges = np.linspace(c_min, c_max, n+1)
+    centers.append(0.5*(edges[1:] + edges[:-1]))
+  grid = np.meshgrid(*centers, indexing="ij")
+  return np.array([g.ravel() for g in grid]).T
+
+#-------------------------------------------------------------------------------
+
+def format_array(array):
+  """ Write a (nested) numeric array as literal of the metadata.
+  """
+  if np.ndim(array) == 0:
+    return repr(float(array))
+  return "[{}]".format(",".join(format_array(a) for a in array))
+
+def write_validation_file(file_path, n_bins=(20,), n_steps=2, delta=0.01,
+                          full_grid=True, name="2f_mu_180to275", energy=250,
+                          cut_value=0.9925, seed=1, masked_bins=()):
+  """ Write a synthetic validation file with the given number of bins in each
+      dimension (at most 3) and the given deviation grid.
+      The masked bins (indices of the regular grid) are left out of the file,
+      like empty bins, so that it has fewer bins than the grid.
+  """
+  if len(n_bins) > len(coordinates):
+    raise ValueError("At most {} dimensions supported.".format(len(coordinates)))
+  rng = np.random.default_rng(seed)
+
+  centers = np.delete(bin_centers(n_bins), list(masked_bins), axis=0)
+  n_total_bins = len(centers)
+  points = deviation_points(n_steps, delta, full_grid)
+
+  # Distribution before the cut and cut efficiency at each deviation point
+  no_cut = rng.uniform(100, 1000, n_total_bins)
+  x = np.abs(centers[:,0])
+  rows = []
+  for dc, dw in points:
+    center = cut_value - 0.05 + dc
+    width = 0.02 * (1.0 + 5.0*dw)
+    efficiency = 1.0 / (1.0 + np.exp((x - center)/width))
+    N_cut = np.round(no_cut * efficiency)
+    N_par = N_cut * (1.0 + rng.normal(0.0, 0.01, n_total_bins))
+    rows.append(np.concatenate(([dc, dw], N_cut, N_par)))
+
+  names = [coordinates[d][0] for d in range(len(n_bins))]
+  with open(file_path, "w") as out:
+    out.write("{}\n".format(CMR.CSVMetadataReader.begin_marker))
+    out.write("Name: {}\n".format(name))
+    out.write("Energy: {}\n".format(energy))
+    out.write("e-Chirality: -1\n")
+    out.write("e+Chirality: 1\n")
+    out.write("NTotalMC: {}\n".format(int(np.sum(no_cut))))
+    out.write("CrossSection: 1234.5\n")
+    out.write("Coef|MuonAcc_CutValue: {}\n".format(cut_value))
+    out.write("Delta: {}\n".format(delta))
+    out.write("CoordName: [{}]\n".format(",".join('"{}"'.format(n) for n in names)))
+    out.write("CoordNBins: [{}]\n".format(",".join(str(n) for n in n_bins)))
+    out.write("CoordMin: {}\n".format(format_array([coordinates[d][1] for d in range(len(n_bins))])))
+    out.write("CoordMax: {}\n".format(format_array([coordinates[d][2] for d in range(len(n_bins))])))
+    out.write("BinCenters: {}\n".format(format_array(centers)))
+    out.write("NoCutData: {}\n".format(format_array(no_cut)))
+    out.write("{}\n".format(CMR.CSVMetadataReader.end_marker))
+
+    header = ["Delta-c", "Delta-w"] + ["C{}".format(b) for b in range(n_total_bins)] + ["P{}".format(b) for b in range(n_total_bins)]
+    out.write("{}\n".format(",".join(header)))
+    np.savetxt(out, np.array(rows), delimiter=",", fmt="%.17g")
+
+  log.debug("Wrote {} ({} bins, {} points)".format(file_path, n_total_bins, len(points)))
+  return file_path
+
+#-------------------------------------------------------------------------------
+
+def main():
+  """ Write a synthetic validation file with the settings from the command line.
+  """
+  log.basicConfig(level=log.INFO, format="%(message)s") # Set logging level
+  parser = argparse.ArgumentParser(description="Write a synthetic validation file.")
+  parser.add_argument("output_dir", help="Directory the file is written to.")
+  parser.add_argument("-b", "--bins", type=int, nargs="+", default=[20],
+                      help="Number of bins in each dimension (at most 3 dimensions).")
+  parser.add_argument("-s", "--steps", type=int, default=2,
+                      help="Number of deviation steps in each direction.")
+  parser.add_argument("--lines-only", action="store_true",
+                      help="Only write the points along the deviation lines, not the full grid.")
+  parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+  args = parser.parse_args()
+
+  os.makedirs(args.output_dir, exist_ok=True)
+  file_path = os.path.join(args.output_dir, file_name())
+  write_validation_file(file_path, tuple(args.bins), args.steps, full_grid=not args.lines_only, seed=args.seed)
+  log.info("Wrote {}".format(file_path))
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
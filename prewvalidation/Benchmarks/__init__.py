@@ -0,0 +1,2 @@
+""" Benchmarks of the processing steps.
+"""
@@ -1,5 +1,8 @@
 import logging as log
-import numpy as np
+
+# Local modules
+from prewvalidation.IO import Compression as IOC
+from prewvalidation.IO import LiteralParser as IOLP
 
 # ------------------------------------------------------------------------------
 
@@ -15,10 +18,11 @@ class CSVMetadataReader:
   float_data = ["Coef|MuonAcc_CutValue", "CrossSection", "Delta"]
   array_data = ["CoordName","CoordNBins","CoordMin","CoordMax","BinCenters","NoCutData"]
 
-  def __init__(self, csv_path):
+  def __init__(self, csv_path=None):
     self.metadata = {}
     self.data_header_line = None
-    self.interpret(csv_path)
+    if csv_path is not None:
+      self.interpret(csv_path)
 
   # --- Access functions -------------------------------------------------------
 
@@ -37,23 +41,30 @@ class CSVMetadataReader:
   def find_metadata_lines(self, csv_path):
     """ Find the lines in the given file that correspond to the metadata.
     """
+    with IOC.open_text(csv_path) as read_obj:
+      return self.read_metadata_lines(read_obj)
+    
+  def read_metadata_lines(self, read_obj):
+    """ Read the metadata lines from an opened file.
+        Stops directly after the end of the metadata, so the file object can 
+        afterwards be used to read the CSV data.
+    """
     # Look line by line
     line_index = 0
     in_metadata = False
     metadata_lines = [] 
-    with open(csv_path, 'r') as read_obj:
-      # Check line by line
-      for line in read_obj:
-        line_index += 1
-        line = line.strip() # Remove trailing/leading whitespaces etc.
-        if self.end_marker in line:
-          break
-        elif self.begin_marker in line:
-          in_metadata = True
-        elif in_metadata:
-          metadata_lines.append(line)
-        else:
-          raise ValueError("Unexpected line before CSV Metadata: {}".format(line))
+    # Use readline instead of iteration, so the file position stays defined
+    for line in iter(read_obj.readline, ''):
+      line_index += 1
+      line = line.strip() # Remove trailing/leading whitespaces etc.
+      if self.end_marker in line:
+        break
+      elif self.begin_marker in line:
+        in_metadata = True
+      elif in_metadata:
+        metadata_lines.append(line)
+      else:
+        raise ValueError("Unexpected line before CSV Metadata: {}".format(line))
       
     self.data_header_line = line_index
     return metadata_lines
@@ -68,17 +79,28 @@ class CSVMetadataReader:
     elif ID in CSVMetadataReader.float_data:
       data = float(data)
     elif ID in CSVMetadataReader.array_data:
-      data = np.array(eval(data))
+      data = IOLP.parse_array(data)
       
     return data
     
   def interpret(self, csv_path):
     """ Interpret the metadata lines found in the CSV file.
     """
+    self.interpret_lines(self.find_metadata_lines(csv_path))
+    
+  def interpret_stream(self, read_obj):
+    """ Interpret the metadata at the top of an opened file.
+        Afterwards the file object is positioned at the CSV data header.
+    """
+    self.interpret_lines(self.read_metadata_lines(read_obj))
+    
+  def interpret_lines(self, metadata_lines):
+    """ Interpret the given metadata lines.
+    """
     # Split each line by the ":" separator and store its value
-    for line in self.find_metadata_lines(csv_path):
+    for line in metadata_lines:
       log.debug("Interpreting line: {}".format(line))
-      ID, data_str = line.split(":")
+      ID, data_str = line.split(":", 1)
       data_str = data_str.strip() # Remove trailing/leading whitespaces etc.
     
       self.metadata[ID] = self.interpret_metadata(ID,data_str)
@@ -0,0 +1,68 @@
+#-------------------------------------------------------------------------------
+
+""" Transparent reading of compressed validation files.
+    Files ending in .gz, .bz2, .xz or .zst are decompressed while they are
+    read, so that a reader that stops early (e.g. after the metadata) only
+    decompresses the beginning of the file. Reading .zst files needs the
+    zstandard module.
+"""
+
+#-------------------------------------------------------------------------------
+
+import bz2
+import gzip
+import lzma
+
+try:
+  import zstandard
+except ImportError: # Optional, only needed for .zst files
+  zstandard = None
+
+#-------------------------------------------------------------------------------
+
+def open_zstd(file_path, mode="rt"):
+  """ Open a zstandard compressed file.
+  """
+  if zstandard is None:
+    raise ImportError("Reading {} needs the zstandard module.".format(file_path))
+  return zstandard.open(file_path, mode)
+
+# Functions opening the file for each compression suffix
+openers = {
+  ".gz": gzip.open,
+  ".bz2": bz2.open,
+  ".xz": lzma.open,
+  ".zst": open_zstd
+}
+
+#-------------------------------------------------------------------------------
+
+def compression_suffix(file_path):
+  """ Compression suffix of the file ("" if the file is not compressed).
+  """
+  for suffix in openers:
+    if file_path.endswith(suffix):
+      return suffix
+  return ""
+
+def strip_compression(file_path):
+  """ Path of the file without its compression suffix.
+  """
+  suffix = compression_suffix(file_path)
+  return file_path[:-len(suffix)] if suffix else file_path
+
+def suffixes(suffix):
+  """ The given file suffix with all supported compression suffixes appended
+      (incl. the uncompressed one), e.g. for file discovery.
+  """
+  return (suffix,) + tuple(suffix + compression for compression in openers)
+
+def open_text(file_path):
+  """ Open the (possibly compressed) file for reading text.
+  """
+  suffix = compression_suffix(file_path)
+  if suffix:
+    return openers[suffix](file_path, "rt")
+  return open(file_path, "r")
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,83 @@
+#-------------------------------------------------------------------------------
+
+""" Fast parser for the (nested) list literals used in the metadata of the
+    validation files, e.g. "[[-0.95,0.1],[-0.85,0.1]]" or '["costh_f_star"]'.
+    Replaces the use of python's eval, which is slow and unsafe on large lists.
+"""
+
+#-------------------------------------------------------------------------------
+
+import ast
+import numpy as np
+import re
+
+#-------------------------------------------------------------------------------
+
+open_brackets = "[("
+close_brackets = "])"
+bracket_pattern = re.compile(r"[\[\]\(\)]")
+innermost_pattern = re.compile(r"[\[\(]([^\[\]\(\)]*)[\]\)]")
+bracket_removal = str.maketrans("[](),", "     ")
+
+#-------------------------------------------------------------------------------
+
+def array_shape(literal, n_values):
+  """ Determine the shape of the nested list literal with the given total
+      number of values. Raises a ValueError if the literal is not rectangular,
+      i.e. if the lists of one nesting level have different lengths.
+  """
+  # Count the sub-lists of each list, all lists of a level need the same count
+  # (the innermost lists have none)
+  n_children = []
+  level_lengths = {}
+  for bracket in bracket_pattern.findall(literal):
+    if bracket in open_brackets:
+      if n_children:
+        n_children[-1] += 1
+      n_children.append(0)
+    elif not n_children:
+      raise ValueError("Unbalanced brackets in literal: {}".format(literal[:50]))
+    else:
+      length = n_children.pop()
+      if level_lengths.setdefault(len(n_children), length) != length:
+        raise ValueError("Literal is not rectangular: {}".format(literal[:50]))
+
+  if n_children or len(level_lengths) == 0:
+    raise ValueError("Unbalanced brackets in literal: {}".format(literal[:50]))
+
+  # All innermost lists need the same number of values
+  value_counts = set(len(content.replace(",", " ").split()) for content in innermost_pattern.findall(literal))
+  if len(value_counts) != 1:
+    raise ValueError("Literal is not rectangular: {}".format(literal[:50]))
+  shape = tuple(level_lengths[level] for level in range(len(level_lengths) - 1)) + (value_counts.pop(),)
+  if int(np.prod(shape)) != n_values:
+    raise ValueError("Literal is not rectangular: {}".format(literal[:50]))
+  return shape
+
+def parse_array(literal):
+  """ Parse a (nested) list literal of numbers or strings to a numpy array.
+      Integer lists give integer arrays, all other numbers give float arrays
+      (same as np.array(eval(literal)) would).
+  """
+  literal = literal.strip()
+  if not literal or literal[0] not in open_brackets:
+    raise ValueError("Not a list literal: {}".format(literal[:50]))
+
+  # String lists are short (e.g. coordinate names), use the safe python parser
+  if "'" in literal or '"' in literal:
+    return np.array(ast.literal_eval(literal))
+
+  tokens = literal.translate(bracket_removal).split()
+  if not tokens:
+    return np.zeros(array_shape(literal, 0), dtype=np.float64)
+  try:
+    values = np.array(tokens, dtype=np.int64)
+  except ValueError:
+    values = np.array(tokens, dtype=np.float64)
+
+  # Simple lists don't need the bracket structure
+  if len(bracket_pattern.findall(literal)) == 2:
+    return values
+  return values.reshape(array_shape(literal, len(values)))
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,136 @@
+#-------------------------------------------------------------------------------
+
+""" Index of the metadata of validation files, so that files can be found and
+    selected by their process, chirality, energy or coordinates without reading
+    their data.
+    Only the metadata section at the top of each file is read (up to the
+    end-of-metadata marker) and the small metadata entries are stored in a JSON
+    index file in the "cache" directory next to the files. An entry is keyed by
+    the size and modification time of its file and re-read when the file
+    changes.
+"""
+
+#-------------------------------------------------------------------------------
+
+import json
+import logging as log
+import numpy as np
+import os
+
+# Local modules
+from prewvalidation.IO import CSVMetadataReader as CMR
+from prewvalidation.IO import ReaderCache as IORC
+from prewvalidation.IO import SysHelpers as IOSH
+
+#-------------------------------------------------------------------------------
+
+# Increase when the layout of the index file changes
+index_version = 1
+
+index_name = "metadata_index.json"
+
+# Metadata stored in the index, the large arrays (bin centers, distributions)
+# are not needed for selecting files
+indexed_metadata = ["Name", "Energy", "e-Chirality", "e+Chirality",
+                    "NTotalMC", "CrossSection", "Coef|MuonAcc_CutValue",
+                    "Delta", "CoordName", "CoordNBins", "CoordMin", "CoordMax"]
+
+#-------------------------------------------------------------------------------
+
+def index_path(directory):
+  """ Path of the index file of the validation files in the given directory.
+  """
+  return os.path.join(directory, "cache", index_name)
+
+def read_metadata(file_path):
+  """ Read the indexed metadata from the top of the given file, the data part
+      of the file is not read.
+  """
+  reader = CMR.CSVMetadataReader()
+  lines = reader.find_metadata_lines(file_path)
+  reader.interpret_lines([line for line in lines if line.split(":", 1)[0] in indexed_metadata])
+  return { ID: value.tolist() if isinstance(value, np.ndarray) else value for ID, value in reader.metadata.items() }
+
+#-------------------------------------------------------------------------------
+
+class MetadataIndex:
+  """ Metadata index of the validation files in one directory.
+  """
+
+  # --- Constructor ------------------------------------------------------------
+
+  def __init__(self, directory):
+    self.path = index_path(directory)
+    self.entries = {}
+    self.changed = False
+    if os.path.isfile(self.path):
+      try:
+        with open(self.path, "r") as index_file:
+          content = json.load(index_file)
+        if content.get("version") == index_version:
+          self.entries = content["entries"]
+      except (OSError, ValueError) as error:
+        log.warning("Ignoring unreadable metadata index {}: {}".format(self.path, error))
+
+  # --- Access functions -------------------------------------------------------
+
+  def metadata(self, file_path):
+    """ Metadata of the given file, read from the file only if the index entry
+        is missing or outdated.
+    """
+    key = IORC.file_key(file_path)
+    entry = self.entries.get(key[0])
+    if entry is None or entry["key"] != key:
+      log.debug("Indexing metadata of {}".format(file_path))
+      entry = { "key": key, "metadata": read_metadata(file_path) }
+      self.entries[key[0]] = entry
+      self.changed = True
+    return entry["metadata"]
+
+  # --- Writing ----------------------------------------------------------------
+
+  def save(self):
+    """ Write the index file if any entry changed.
+    """
+    if not self.changed:
+      return
+    with IOSH.atomic_write(self.path) as index_file:
+      json.dump({ "version": index_version, "entries": self.entries }, index_file, indent=1, sort_keys=True)
+    self.changed = False
+
+#-------------------------------------------------------------------------------
+
+def iter_metadata(file_paths, use_index=True):
+  """ Lazily get the metadata of the given files, using (and updating) the 
+      index of each directory. The updated indices are written at the end.
+      Without use_index the metadata is read from each file and no index is
+      read or written.
+      Yields each file path with its metadata (None for files whose metadata
+      can't be read).
+  """
+  indices = {}
+  try:
+    for file_path in file_paths:
+      directory = os.path.dirname(os.path.abspath(file_path))
+      if use_index and directory not in indices:
+        indices[directory] = MetadataIndex(directory)
+      try:
+        metadata = indices[directory].metadata(file_path) if use_index else read_metadata(file_path)
+      except (OSError, ValueError) as error:
+        log.warning("Could not read the metadata of {}: {}".format(file_path, error))
+        metadata = None
+      yield file_path, metadata
+  finally:
+    for index in indices.values():
+      try:
+        index.save()
+      except OSError as error:
+        log.warning("Could not write metadata index {}: {}".format(index.path, error))
+
+def file_metadata(file_paths):
+  """ Metadata of all given files, see iter_metadata.
+      Returns a dictionary of the file paths and their metadata.
+  """
+  return dict(iter_metadata(file_paths))
+
+#-------------------------------------------------------------------------------
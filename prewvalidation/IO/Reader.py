@@ -0,0 +1,270 @@
+import itertools
+import logging as log
+import numpy as np
+import re
+
+# Local modules
+from prewvalidation.IO import CSVMetadataReader as CMR
+from prewvalidation.IO import Compression as IOC
+from prewvalidation.IO import ReaderCache as IORC
+
+# ------------------------------------------------------------------------------
+
+# Storage types of the cut ("C") and parametrisation ("P") bin contents, the
+# [delta-c, delta-w] pairs are always stored in double precision.
+# The compact modes halve the memory of the bin contents, the consumers convert
+# them to double precision where the chi-squared values are accumulated. The 
+# integer mode requires integer cut bin contents (event counts).
+bin_storages = {
+  "float64": { "C": np.float64, "P": np.float64 },
+  "float32": { "C": np.float32, "P": np.float32 },
+  "integer": { "C": np.int32, "P": np.float32 }
+}
+
+# ------------------------------------------------------------------------------
+
+def check_bin_storage(bin_storage):
+  """ Raise a ValueError if the bin storage is unknown.
+  """
+  if bin_storage not in bin_storages:
+    raise ValueError("Unknown bin storage \"{}\", use one of {}.".format(bin_storage, ", ".join(bin_storages)))
+
+def total_bins(metadata):
+  """ Total number of bins of the distributions, one per bin center. Files
+      may leave out bins of the grid (e.g. empty ones), so this can be less
+      than the product of the number of bins in each dimension.
+  """
+  return len(metadata["BinCenters"])
+
+def column_names(n_bins):
+  """ Names of the cut ("C"), parametrisation ("P") and [delta-c, delta-w]
+      ("Deltas") columns of the distribution data.
+  """
+  return { "C": ["C{}".format(b) for b in range(n_bins)],
+           "P": ["P{}".format(b) for b in range(n_bins)],
+           "Deltas": ["Delta-c", "Delta-w"] }
+
+def data_schema(n_bins, bin_storage="float64"):
+  """ Declared type of each column of the distribution data, so that the CSV
+      parser doesn't need to infer the types of the wide bin columns.
+  """
+  storage = dict(bin_storages[bin_storage], Deltas=np.float64)
+  return { column: storage[name] for name, columns in column_names(n_bins).items() for column in columns }
+
+def check_columns(columns, n_bins, file_path):
+  """ Raise a ValueError if the bin columns of the distribution data don't
+      match the bins (bin centers) of the metadata.
+  """
+  names = column_names(n_bins)
+  bin_columns = [column for column in columns if re.fullmatch(r"[CP]\d+", column)]
+  missing = [column for column in names["Deltas"] if column not in columns]
+  if missing or set(bin_columns) != set(names["C"] + names["P"]):
+    raise ValueError("The data of {} doesn't match its metadata: expected the columns {} and C/P columns for {} bins (BinCenters), found {} C/P columns.".format(
+      file_path, ", ".join(names["Deltas"]), n_bins, len(bin_columns)))
+
+def column_positions(columns, n_bins):
+  """ Positions of the cut ("C"), parametrisation ("P") and [delta-c, delta-w]
+      ("Deltas") columns of the distribution data.
+      The column names are only looked up once here, consumers can then 
+      select rows with masks or indices without pandas overhead.
+  """
+  positions = { name: i for i, name in enumerate(columns) }
+  return { name: [positions[column] for column in names] for name, names in column_names(n_bins).items() }
+
+def data_arrays(values, positions, row_index):
+  """ Build the contiguous numpy arrays (see Reader) from the values of the
+      distribution data (or a chunk of its rows).
+  """
+  arrays = { name: np.ascontiguousarray(values[:,column_positions]) for name, column_positions in positions.items() }
+  arrays["RowIndex"] = row_index
+  return arrays
+
+def block_arrays(blocks, n_bins):
+  """ Build the contiguous numpy arrays (see Reader) from the blocks of
+      columns of the cached distribution data, each array keeps the type of 
+      its block.
+  """
+  locations = { column: (i_block, i) for i_block, (columns, _) in enumerate(blocks) for i, column in enumerate(columns) }
+  arrays = {}
+  for name, names in column_names(n_bins).items():
+    block_ids = set(locations[column][0] for column in names)
+    if len(block_ids) == 1:
+      values = blocks[block_ids.pop()][1][:,[locations[column][1] for column in names]]
+    else:
+      values = np.column_stack([blocks[locations[column][0]][1][:,locations[column][1]] for column in names])
+    arrays[name] = np.ascontiguousarray(values)
+  arrays["RowIndex"] = np.arange(len(arrays["Deltas"]))
+  return arrays
+
+def storage_arrays(arrays, bin_storage):
+  """ Convert the bin content arrays to the given bin storage (see 
+      bin_storages), integer storage requires integer bin contents.
+  """
+  for name, dtype in bin_storages[bin_storage].items():
+    values = arrays[name].astype(dtype, copy=False)
+    if np.issubdtype(dtype, np.integer) and not np.array_equal(values, arrays[name]):
+      raise ValueError("The {} bin contents are not integer, use another bin storage than \"{}\".".format(name, bin_storage))
+    arrays[name] = values
+  return arrays
+
+# ------------------------------------------------------------------------------
+
+class Reader:
+  """ Class to read / interpret a validation data file.
+      If requested, the parsed content is stored in (and read from) a binary
+      cache file next to the input file.
+      
+      Besides the metadata and the pandas dataframe ("Data") the reader 
+      provides the bin contents as contiguous (n_deviation_points, n_bins) 
+      numpy arrays ("C" for the cut, "P" for the parametrisation), the 
+      [delta-c, delta-w] pair of each row ("Deltas") and the dataframe index of
+      each row ("RowIndex"). When read from the cache, the dataframe is only
+      created (and pandas imported) when it is accessed.
+      
+      The bin_storage selects the type of the bin contents (see bin_storages).
+  """
+  
+  # --- Constructor ------------------------------------------------------------
+  
+  def __init__(self,file_path,use_cache=False,bin_storage="float64"):
+    check_bin_storage(bin_storage)
+    self.data = {}
+    self.use_cache = use_cache
+    self.bin_storage = bin_storage
+    self.interpret(file_path)
+    
+  # --- Access functions -------------------------------------------------------
+    
+  def __getitem__(self,index):
+    """ Define what happens when the [] operator is applied (only reading).
+    """
+    if index == "Data" and "Data" not in self.data:
+      import pandas as pd
+      blocks = [pd.DataFrame(values, columns=columns) for columns, values in self.data["DataBlocks"]]
+      self.data["Data"] = pd.concat(blocks, axis=1)[list(self.data["DataColumns"])]
+    return self.data[index]
+    
+  def cut0_row(self, rel_tolerance=1e-6):
+    """ Find the row (position in the arrays) of the reference point without
+        deviation in the cut (delta-c = delta-w = 0).
+        The tolerance is relative to the deviation step size of the file.
+    """
+    tolerance = rel_tolerance * abs(self.data["Delta"])
+    rows = np.flatnonzero(np.all(np.abs(self.data["Deltas"]) <= tolerance, axis=1))
+    if len(rows) == 0:
+      raise ValueError("No reference point (delta-c = delta-w = 0) found.")
+    return rows[0]
+    
+  # --- Internal functions -----------------------------------------------------
+    
+  def interpret(self,file_path):
+    """ Read and interpret the input file.
+    """
+    # Use the cached content if it is up to date
+    if self.use_cache:
+      cached_data = IORC.load(file_path, self.bin_storage)
+      if cached_data is not None:
+        log.debug("Using cached content for {}".format(file_path))
+        self.data = cached_data
+        self.data.update(block_arrays(self.data["DataBlocks"], total_bins(self.data)))
+        return
+    
+    # Open the file only once: the metadata reader stops at the end of the 
+    # metadata, the CSV parser then continues from there
+    with IOC.open_text(file_path) as read_obj:
+      # Find and use the metadata
+      mr = CMR.CSVMetadataReader()
+      mr.interpret_stream(read_obj)
+      self.data = mr.metadata
+      
+      # Find the distribution data, the column types are declared by the
+      # schema (pandas is only imported when a file is parsed, it takes long 
+      # to import)
+      import pandas as pd
+      n_bins = total_bins(self.data)
+      try:
+        self.data["Data"] = pd.read_csv(read_obj, dtype=data_schema(n_bins, self.bin_storage), engine="c")
+      except ValueError as error:
+        raise ValueError("Can't read the distribution data of {} with bin storage \"{}\": {}".format(file_path, self.bin_storage, error))
+      check_columns(list(self.data["Data"].columns), n_bins, file_path)
+    
+    if self.use_cache:
+      try:
+        IORC.save(file_path, self.data, self.bin_storage)
+      except OSError as error:
+        log.warning("Could not write cache for {}: {}".format(file_path, error))
+        
+    # Select the columns of each array from the dataframe, the columns of one
+    # array share their type
+    df = self.data["Data"]
+    for name, columns in column_names(n_bins).items():
+      self.data[name] = np.ascontiguousarray(df[columns].to_numpy())
+    self.data["RowIndex"] = df.index.to_numpy()
+    
+# ------------------------------------------------------------------------------
+
+class ChunkedReader:
+  """ Class to read a validation data file in chunks of rows, for files whose
+      data doesn't fit into memory at once.
+      The metadata is read directly and accessible with the [] operator, the 
+      data section is only read when iterating over the chunks. Each chunk
+      provides the same arrays as the Reader ("C", "P", "Deltas", "RowIndex")
+      for at most chunk_rows rows, the bin contents in the given bin storage.
+  """
+  
+  # --- Constructor ------------------------------------------------------------
+  
+  def __init__(self,file_path,chunk_rows=100,bin_storage="float64"):
+    check_bin_storage(bin_storage)
+    self.file_path = file_path
+    self.chunk_rows = chunk_rows
+    self.bin_storage = bin_storage
+    self.data = CMR.CSVMetadataReader(file_path).metadata
+    
+  # --- Access functions -------------------------------------------------------
+    
+  def __getitem__(self,index):
+    """ Define what happens when the [] operator is applied (only reading).
+    """
+    return self.data[index]
+    
+  def chunks(self):
+    """ Iterate over the chunks of the data section, each pass over the chunks
+        reads the file again.
+        The rows are parsed directly with numpy, building a dataframe for each
+        chunk of the wide data section would take longer than the parsing.
+    """
+    with IOC.open_text(self.file_path) as read_obj:
+      CMR.CSVMetadataReader().read_metadata_lines(read_obj) # Skip the metadata
+      columns = [name.strip().strip('"') for name in read_obj.readline().split(",")]
+      n_bins = total_bins(self.data)
+      check_columns(columns, n_bins, self.file_path)
+      positions = column_positions(columns, n_bins)
+      first_row = 0
+      while True:
+        lines = list(itertools.islice(read_obj, self.chunk_rows))
+        if not lines:
+          break
+        values = np.loadtxt(lines, delimiter=",", dtype=np.float64, ndmin=2)
+        if len(values) == 0:
+          continue
+        arrays = data_arrays(values, positions, np.arange(first_row, first_row + len(values)))
+        yield storage_arrays(arrays, self.bin_storage)
+        first_row += len(values)
+    
+# ------------------------------------------------------------------------------
+
+def test():
+  """ Test the reader.
+  """
+  log.basicConfig(level=log.DEBUG) # Set logging level
+  test_file = "/home/jakob/Documents/DESY/MountPoints/DUSTMount/TGCAnalysis/SampleProduction/NewMCProduction/2f_Z_l/PrEWInput/validation/2f_mu_180to275_250_eLpR_valdata.csv"
+  reader = Reader(test_file)
+  log.debug(reader.data)
+
+if __name__ == "__main__":
+  """ If this script is called directly perform the test function.
+  """
+  test()
+
+# ------------------------------------------------------------------------------
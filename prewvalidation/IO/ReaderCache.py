@@ -0,0 +1,121 @@
+#-------------------------------------------------------------------------------
+
+""" Binary on-disk cache for the parsed content of validation data files.
+    The parsed metadata and the distribution data of a CSV file are stored in
+    an uncompressed numpy .npz sidecar file in a "cache" directory next to the
+    CSV file. The cache entry is keyed by the path, size and modification time
+    of the CSV file and by the bin storage it was parsed with, it is 
+    regenerated automatically when either changes.
+"""
+
+#-------------------------------------------------------------------------------
+
+import json
+import logging as log
+import numpy as np
+import os
+
+# Local modules
+from prewvalidation.IO import SysHelpers as IOSH
+
+#-------------------------------------------------------------------------------
+
+# Increase when the layout of the cache files changes
+cache_version = 1
+
+#-------------------------------------------------------------------------------
+# Keys and paths
+
+def cache_path(file_path):
+  """ Path of the cache file that belongs to the given CSV file.
+  """
+  base_name = os.path.basename(file_path)
+  return os.path.join(os.path.dirname(file_path), "cache", "{}.npz".format(base_name))
+
+def file_key(file_path):
+  """ Key identifying the current state of the given file: absolute path, size
+      and modification time.
+  """
+  stat = os.stat(file_path)
+  return [os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns]
+
+#-------------------------------------------------------------------------------
+# Writing
+
+def save(file_path, data, bin_storage="float64"):
+  """ Write the parsed data of the given CSV file into its cache file.
+      The "Data" entry must be the pandas dataframe of the distribution data,
+      all other entries are metadata. The bin storage (see IO/Reader) is 
+      recorded, the cached values are only exact for it.
+  """
+  import pandas as pd # Only imported when needed, it takes long to import
+  arrays = {}
+  scalar_metadata = {}
+  for ID, value in data.items():
+    if ID == "Data":
+      continue
+    elif isinstance(value, np.ndarray):
+      arrays["meta:{}".format(ID)] = value
+    else:
+      scalar_metadata[ID] = value
+
+  # Group the dataframe columns by dtype, so that every group is one
+  # contiguous 2D array on disk
+  df = data["Data"]
+  arrays["data_columns"] = np.array(df.columns, dtype=str)
+  dtypes = df.dtypes
+  for i_block, dtype in enumerate(pd.unique(dtypes)):
+    block_columns = df.columns[(dtypes == dtype).values]
+    arrays["data_block{}_columns".format(i_block)] = np.array(block_columns, dtype=str)
+    arrays["data_block{}_values".format(i_block)] = df[block_columns].to_numpy()
+
+  header = { "version": cache_version,
+             "key": file_key(file_path),
+             "bin_storage": bin_storage,
+             "metadata": scalar_metadata }
+  arrays["header"] = np.array(json.dumps(header))
+
+  with IOSH.atomic_write(cache_path(file_path), "wb") as cache_file:
+    np.savez(cache_file, **arrays)
+
+#-------------------------------------------------------------------------------
+# Reading
+
+def load(file_path, bin_storage="float64"):
+  """ Load the parsed data of the given CSV file from its cache file.
+      The distribution data is returned as the column names ("DataColumns")
+      and a list of (column names, values) blocks of columns with the same 
+      type ("DataBlocks"), so that pandas is not needed for reading the cache
+      and the compact types are kept.
+      Returns None if there is no cache file, if it is outdated or if it was
+      written for another bin storage.
+  """
+  path = cache_path(file_path)
+  if not os.path.isfile(path):
+    return None
+
+  with np.load(path, allow_pickle=False) as cache:
+    header = json.loads(str(cache["header"]))
+    if header["version"] != cache_version:
+      log.debug("Cache file {} has outdated version.".format(path))
+      return None
+    if header["key"] != file_key(file_path):
+      log.debug("Cache file {} is outdated.".format(path))
+      return None
+    if header.get("bin_storage", "float64") != bin_storage:
+      log.debug("Cache file {} has another bin storage.".format(path))
+      return None
+
+    data = header["metadata"]
+    data["DataBlocks"] = []
+    for name in cache.files:
+      if name.startswith("meta:"):
+        data[name[len("meta:"):]] = cache[name]
+      elif name.startswith("data_block") and name.endswith("_columns"):
+        block_name = name[:-len("_columns")]
+        data["DataBlocks"].append((cache[name], cache["{}_values".format(block_name)]))
+    data["DataColumns"] = cache["data_columns"]
+
+  return data
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,85 @@
+#-------------------------------------------------------------------------------
+
+""" Machine-readable storage of the validation results of one input file.
+    The results are stored column-wise in an uncompressed numpy .npz file:
+    row columns have one entry per (direction, deviation point), bin columns
+    one entry per histogram bin. A JSON header identifies the results (kind of
+    result, process, chirality, coordinates, ...).
+"""
+
+#-------------------------------------------------------------------------------
+
+import json
+import numpy as np
+import os
+
+# Local modules
+from prewvalidation.IO import SysHelpers as IOSH
+
+#-------------------------------------------------------------------------------
+
+# Increase when the layout of the result files changes
+result_version = 1
+
+row_prefix = "row:"
+bin_prefix = "bin:"
+
+#-------------------------------------------------------------------------------
+
+def results_dir(output_dir):
+  """ Directory of the result files in the given output directory.
+  """
+  return os.path.join(output_dir, "results")
+
+def result_path(output_dir, base_name, kind):
+  """ Path of the result file of the given kind (e.g. "ChiSquared") for the
+      input file with the given base name.
+  """
+  return os.path.join(results_dir(output_dir), "{}_{}.npz".format(base_name, kind))
+
+def find_results(output_dir, kind):
+  """ Find all result files of the given kind in the given output directory.
+  """
+  directory = results_dir(output_dir)
+  if not os.path.isdir(directory):
+    return []
+  suffix = "_{}.npz".format(kind)
+  return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(suffix))
+
+def save(path, kind, header, row_columns, bin_columns={}):
+  """ Write the results into the given file.
+      All row columns must have the same length (first dimension), as must all
+      bin columns.
+  """
+  for columns in [row_columns, bin_columns]:
+    lengths = set(len(column) for column in columns.values())
+    if len(lengths) > 1:
+      raise ValueError("Columns of {} have different lengths {}.".format(kind, sorted(lengths)))
+
+  arrays = {}
+  for name, column in row_columns.items():
+    arrays["{}{}".format(row_prefix, name)] = np.asarray(column)
+  for name, column in bin_columns.items():
+    arrays["{}{}".format(bin_prefix, name)] = np.asarray(column)
+  arrays["header"] = np.array(json.dumps(dict(header, kind=kind, version=result_version)))
+
+  with IOSH.atomic_write(path, "wb") as result_file:
+    np.savez(result_file, **arrays)
+
+def load(path):
+  """ Load the results from the given file.
+      Returns the header and the dictionaries of the row and bin columns.
+  """
+  with np.load(path, allow_pickle=False) as results:
+    header = json.loads(str(results["header"]))
+    if header["version"] != result_version:
+      raise ValueError("Result file {} has version {}, expected {}.".format(path, header["version"], result_version))
+    row_columns, bin_columns = {}, {}
+    for name in results.files:
+      if name.startswith(row_prefix):
+        row_columns[name[len(row_prefix):]] = results[name]
+      elif name.startswith(bin_prefix):
+        bin_columns[name[len(bin_prefix):]] = results[name]
+  return header, row_columns, bin_columns
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,102 @@
+# ------------------------------------------------------------------------------
+
+""" Helper function related to the system that your running on.
+"""
+
+# ------------------------------------------------------------------------------
+
+from pathlib import Path
+import contextlib
+import fnmatch
+import logging as log
+import os
+import tempfile
+
+# ------------------------------------------------------------------------------
+# Creating
+
+def create_dir(dir):
+  """ Try to create the given directory and it's parents.
+  """
+  Path(dir).mkdir(parents=True, exist_ok=True)
+
+@contextlib.contextmanager
+def atomic_write(path, mode="w"):
+  """ Open a temporary file next to the given path for writing and move it in
+      place once it is fully written, so that concurrent readers never see a
+      half-written file. The directory is created if needed, the temporary 
+      file is removed if writing fails.
+  """
+  file_dir = os.path.dirname(path)
+  create_dir(file_dir)
+  tmp_fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1], dir=file_dir)
+  try:
+    with os.fdopen(tmp_fd, mode) as tmp_file:
+      yield tmp_file
+    os.replace(tmp_path, path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+
+# ------------------------------------------------------------------------------
+# Finding
+
+def matches_pattern(name, rel_path, pattern):
+  """ Check a file against a pattern: strings are shell-style patterns matched
+      against the file name, compiled regular expressions are searched in the
+      path relative to the searched directory.
+  """
+  if isinstance(pattern, str):
+    return fnmatch.fnmatchcase(name, pattern)
+  return pattern.search(rel_path) is not None
+
+def iter_files(dir, suffix=None, recursive=False, include=None, exclude=None,
+               skip_dirs=("cache", "plots")):
+  """ Lazily find the files in the directory (and its subdirectories if 
+      recursive), so that the files can be processed while the search 
+      continues.
+      Only files whose name ends exactly with the suffix (or one of a tuple 
+      of suffixes) are found, e.g. ".csv" doesn't match "a.csv.bak".
+      A file must match any of the include patterns (if given) and none of 
+      the exclude patterns, see matches_pattern.
+      Directories are searched in sorted order, the directories in skip_dirs
+      (outputs of the validation) are not entered.
+  """
+  include = include or []
+  exclude = exclude or []
+  pending_dirs = [""]
+  while pending_dirs:
+    rel_dir = pending_dirs.pop()
+    try:
+      with os.scandir(os.path.join(dir, rel_dir)) as dir_entries:
+        entries = sorted(dir_entries, key=lambda entry: entry.name)
+    except OSError as error:
+      if not rel_dir:
+        raise
+      log.warning("Skipping unreadable directory: {}".format(error))
+      continue
+
+    sub_dirs = []
+    for entry in entries:
+      rel_path = os.path.join(rel_dir, entry.name)
+      if entry.is_dir(follow_symlinks=False):
+        if recursive and entry.name not in skip_dirs:
+          sub_dirs.append(rel_path)
+      elif entry.is_file():
+        if suffix is not None and not entry.name.endswith(suffix):
+          continue
+        if include and not any(matches_pattern(entry.name, rel_path, pattern) for pattern in include):
+          continue
+        if any(matches_pattern(entry.name, rel_path, pattern) for pattern in exclude):
+          continue
+        yield os.path.join(dir, rel_path)
+
+    # Depth-first, keeping the sorted order of the subdirectories
+    pending_dirs.extend(reversed(sub_dirs))
+
+def find_files(dir,extension):
+  """ Find all the files of a given extension in the directory.
+  """
+  return list(iter_files(dir, suffix=extension))
+
+# ------------------------------------------------------------------------------
@@ -0,0 +1,2 @@
+""" Reading and caching of the validation files and the exported results.
+"""
@@ -0,0 +1,88 @@
+#-------------------------------------------------------------------------------
+
+""" Functions and classes to help with colors in plotting.
+"""
+
+#-------------------------------------------------------------------------------
+
+import matplotlib as mpl
+from matplotlib import cm
+import numpy as np
+
+#-------------------------------------------------------------------------------
+
+def get_colormap(cm_name):
+  """ Get the matplotlib colormap of the given name (cm.get_cmap was removed in
+      newer matplotlib versions).
+  """
+  if hasattr(mpl, "colormaps"):
+    return mpl.colormaps[cm_name]
+  return cm.get_cmap(cm_name)
+
+class ColorLookup:
+  """ Lookup table of all colors of a matplotlib colormap, so that the colors
+      of whole arrays of values are found with a single indexing operation.
+      The values are mapped to the table entries the same way the colormap
+      does it.
+  """
+  def __init__(self,cm_name):
+    self.colormap = get_colormap(cm_name)
+    self.n_entries = self.colormap.N
+    self.table = self.colormap(np.arange(self.n_entries))
+
+  def __call__(self,fractions):
+    """ Colors for the given fraction(s) in [0,1] of the colormap range.
+        Returns an RGBA tuple for a single fraction, an array of RGBA rows (one
+        per element) for an array of fractions.
+    """
+    entries = np.clip(np.asarray(fractions, dtype=float) * self.n_entries, 0, self.n_entries - 1).astype(int)
+    colors = self.table[entries]
+    if np.ndim(fractions) == 0:
+      return tuple(colors)
+    return colors
+
+#-------------------------------------------------------------------------------
+
+class ColorMap:
+  """ A colormap class using a matplotlib color map to draw colors for a given
+      number of points.
+  """
+  def __init__(self,cm_name,n_colors):
+    self.colormap = ColorLookup(cm_name)
+    self.n_colors = n_colors
+
+  def __getitem__(self,index):
+    """ Define what happens when the [] operator is applied (only reading).
+        Accepts a single index or an array of indices.
+    """
+    return self.colormap(np.asarray(index, dtype=float)/float(self.n_colors-1))
+
+#-------------------------------------------------------------------------------
+
+class ColorSpectrum:
+  """ A colormap class using a matplotlib color map to draw colors for a range
+      of values between given minimum and maximum.
+  """
+  def __init__(self,cm_name,v_min,v_max):
+    self.colormap = ColorLookup(cm_name)
+    self.v_min = v_min
+    self.v_max = v_max
+
+  def __getitem__(self,index):
+    """ Define what happens when the [] operator is applied (only reading).
+        Accepts a single value or an array of values (see colors).
+    """
+    return self.colors(index)
+
+  def colors(self,values):
+    """ Colors for an array of values at once, returned as array of RGBA rows
+        (an RGBA tuple for a single value). Non-finite values have no color.
+    """
+    values = np.asarray(values, dtype=float)
+    if not np.all(np.isfinite(values)):
+      raise ValueError("Requested colors for non-finite values.")
+    if np.any((values < self.v_min) | (values > self.v_max)):
+      raise ValueError("Requested colors for values out of range [{},{}].".format(self.v_min,self.v_max))
+    return self.colormap((values - self.v_min)/float(self.v_max - self.v_min))
+
+#-------------------------------------------------------------------------------
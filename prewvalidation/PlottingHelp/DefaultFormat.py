@@ -1,6 +1,5 @@
-import matplotlib
-
 def set_default_mpl_format():
+  import matplotlib # Only imported when the style is set, it takes long to import
   matplotlib.style.use('tableau-colorblind10') 
   matplotlib.rcParams.update({'font.size': 22})
   matplotlib.rc('image', cmap='cividis')
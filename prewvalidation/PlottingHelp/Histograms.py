@@ -0,0 +1,125 @@
+#-------------------------------------------------------------------------------
+
+""" Functions to calculate and draw many histograms at once.
+"""
+
+#-------------------------------------------------------------------------------
+
+import numpy as np
+
+#-------------------------------------------------------------------------------
+
+def bin_indices(values, bin_edges):
+  """ Index of the bin each value falls into, following the numpy.histogram
+      convention (last bin includes its upper edge). Values outside of the bin
+      range get the index -1.
+  """
+  n_bins = len(bin_edges) - 1
+  indices = np.searchsorted(bin_edges, values, side="right") - 1
+  indices[values == bin_edges[-1]] = n_bins - 1
+  indices[(indices < 0) | (indices >= n_bins)] = -1
+  return indices
+
+def histograms(values, bin_edges, weights=None):
+  """ Histogram each row of the values matrix (shape (n_rows, n_values)) with
+      the same bin edges.
+      Values can also be a single row that is shared by all rows of the
+      weights. Returns a matrix of shape (n_rows, n_bins).
+  """
+  values = np.asarray(values, dtype=float)
+  if weights is None:
+    weights = np.ones(np.shape(values))
+  weights = np.asarray(weights, dtype=float)
+  values = np.broadcast_to(values, weights.shape)
+  n_rows, n_bins = weights.shape[0], len(bin_edges) - 1
+
+  indices = bin_indices(values, bin_edges)
+  in_range = indices >= 0
+  flat_indices = (indices + n_bins * np.arange(n_rows)[:,np.newaxis])[in_range]
+
+  counts = np.bincount(flat_indices, weights=weights[in_range], minlength=n_rows*n_bins)
+  return counts.reshape(n_rows, n_bins)
+
+#-------------------------------------------------------------------------------
+
+class BinProjection:
+  """ Projection of multi-dimensional bins onto each of their coordinates.
+      The 1D bin of each multi-dimensional bin in each dimension is found once,
+      afterwards whole matrices of bin contents are projected onto all 
+      dimensions with a single bincount.
+  """
+
+  # --- Constructor ------------------------------------------------------------
+
+  def __init__(self, bin_centers, coord_min, coord_max, coord_n_bins):
+    bin_centers = np.asarray(bin_centers, dtype=float)
+    self.n_bins, self.n_dims = bin_centers.shape
+    self.bin_edges = [np.linspace(coord_min[d], coord_max[d], coord_n_bins[d]+1) for d in range(self.n_dims)]
+
+    # Position of the 1D bins of each dimension in the concatenation of all
+    # projections
+    self.offsets = np.concatenate(([0], np.cumsum([len(edges)-1 for edges in self.bin_edges])))
+
+    # Index of each (multi-dim. bin, dimension) in the concatenated projections
+    indices = np.column_stack([bin_indices(bin_centers[:,d], edges) for d, edges in enumerate(self.bin_edges)])
+    self.in_range = indices >= 0
+    self.flat_indices = (indices + self.offsets[:-1])[self.in_range]
+    self.bin_of_index = np.nonzero(self.in_range)[0]
+
+  # --- Projection -------------------------------------------------------------
+
+  def project(self, weights):
+    """ Project the bin contents onto each dimension.
+        The weights are either one value per bin or a matrix of shape
+        (n_rows, n_bins). Returns a list with the projection on each dimension
+        of shape (n_bins_d,) or (n_rows, n_bins_d) respectively.
+    """
+    weights = np.asarray(weights, dtype=float)
+    single_row = weights.ndim == 1
+    weights = np.atleast_2d(weights)
+    n_rows, n_total = weights.shape[0], self.offsets[-1]
+
+    flat_indices = (self.flat_indices + n_total * np.arange(n_rows)[:,np.newaxis]).ravel()
+    counts = np.bincount(flat_indices, weights=weights[:,self.bin_of_index].ravel(), minlength=n_rows*n_total)
+    counts = counts.reshape(n_rows, n_total)
+
+    projections = [counts[:,start:end] for start, end in zip(self.offsets[:-1], self.offsets[1:])]
+    return [p[0] for p in projections] if single_row else projections
+
+#-------------------------------------------------------------------------------
+
+def step_lines(bin_edges, counts, orientation="vertical"):
+  """ Outlines of the step histograms (one per row of counts), drawn from the
+      baseline at 0 like matplotlib's histtype='step'.
+      Returns an array of shape (n_rows, n_vertices, 2).
+  """
+  counts = np.atleast_2d(counts)
+  n_rows = counts.shape[0]
+  edges = np.repeat(bin_edges, 2)
+  heights = np.zeros((n_rows, len(edges)))
+  heights[:,1:-1] = np.repeat(counts, 2, axis=1)
+
+  lines = np.empty((n_rows, len(edges), 2))
+  i_edge, i_height = (0, 1) if orientation == "vertical" else (1, 0)
+  lines[:,:,i_edge] = edges
+  lines[:,:,i_height] = heights
+  return lines
+
+def draw_step_histograms(ax, bin_edges, counts, colors, orientation="vertical", **kwargs):
+  """ Draw the step histograms (one per row of counts) as a single collection.
+      Additional arguments are passed on to the LineCollection.
+  """
+  from matplotlib.collections import LineCollection # Only needed for drawing, the binning works without matplotlib
+  lines = LineCollection(step_lines(bin_edges, counts, orientation), colors=colors, **kwargs)
+
+  # Keep the baseline at the edge of the axis, as for matplotlib histograms
+  if orientation == "vertical":
+    lines.sticky_edges.y.append(0)
+  else:
+    lines.sticky_edges.x.append(0)
+
+  ax.add_collection(lines)
+  ax.autoscale_view()
+  return lines
+
+#-------------------------------------------------------------------------------
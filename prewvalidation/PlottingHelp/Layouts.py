@@ -0,0 +1,122 @@
+#-------------------------------------------------------------------------------
+
+""" Reusable figure layouts.
+    The figure and its axes are created once, for each plot only the drawn
+    data, the labels, the limits and the legend are exchanged.
+"""
+
+#-------------------------------------------------------------------------------
+
+import matplotlib.pyplot as plt
+
+#-------------------------------------------------------------------------------
+
+def clear_axes(axes):
+  """ Remove all drawn data and the legend from the given axes and reset their
+      limits and property cycle, so that they can be reused for a new plot.
+  """
+  for ax in axes:
+    for artist in list(ax.collections) + list(ax.patches) + list(ax.lines):
+      artist.remove()
+    legend = ax.get_legend()
+    if legend is not None:
+      legend.remove()
+    ax.ignore_existing_data_limits = True
+    ax.set_autoscale_on(True)
+    ax.set_prop_cycle(None)
+
+#-------------------------------------------------------------------------------
+
+class ScatterHistLayout:
+  """ Layout of a scatter plot with marginal histograms above it (x) and to
+      the right of it (y).
+  """
+  figsize = (12,10)
+  left, width = 0.17, 0.49
+  bottom, height = 0.12, 0.49
+  spacing = 0.005
+
+  def __init__(self):
+    left, width = self.left, self.width
+    bottom, height = self.bottom, self.height
+    spacing = self.spacing
+
+    # definitions for the axes
+    rect_scatter = [left, bottom, width, height]
+    rect_histx = [left, bottom + height + spacing, width, 0.93 - (bottom + height + spacing)]
+    rect_histy = [left + width + spacing, bottom, 0.93 - (left + width + spacing), height]
+    self.leg_pos = [(width + spacing)/width, (height + spacing)/height]
+
+    self.fig = plt.figure(figsize=self.figsize)
+
+    self.ax_scatter = self.fig.add_axes(rect_scatter)
+    self.ax_scatter.tick_params(direction='in', top=True, right=True)
+    self.ax_histx = self.fig.add_axes(rect_histx)
+    self.ax_histx.tick_params(direction='in', labelbottom=False)
+    self.ax_histx.set_ylabel("$\\sum_{bins} y^2$")
+    self.ax_histy = self.fig.add_axes(rect_histy)
+    self.ax_histy.tick_params(direction='in', labelleft=False)
+    self.ax_histy.set_xlabel("#bins")
+
+  def start_plot(self, title, x_label, y_label):
+    """ Remove the previous plot and set the labels for the new one.
+    """
+    clear_axes([self.ax_scatter, self.ax_histx, self.ax_histy])
+    self.fig.suptitle(title)
+    self.ax_scatter.set_xlabel(x_label)
+    self.ax_scatter.set_ylabel(y_label)
+
+  def finish_plot(self, x_lim, legend_title, handles=None):
+    """ Set the limits and the legend after the data is drawn.
+        The legend entries can be given explicitly as handles.
+    """
+    self.ax_scatter.set_xlim(x_lim)
+    self.ax_histx.set_xlim(self.ax_scatter.get_xlim())
+    self.ax_histy.set_ylim(self.ax_scatter.get_ylim())
+    self.ax_scatter.legend(handles=handles, loc=self.leg_pos, title=legend_title, ncol=2)
+
+  def close(self):
+    """ Close the figure once the layout isn't needed anymore.
+    """
+    plt.close(self.fig)
+
+#-------------------------------------------------------------------------------
+
+class ScatterLayout:
+  """ Layout of a single scatter plot (without marginal histograms).
+  """
+  figsize = (9,7)
+
+  def __init__(self):
+    self.fig = plt.figure(figsize=self.figsize, tight_layout=True)
+    self.ax_scatter = self.fig.add_subplot()
+    self.ax_histx = None
+    self.ax_histy = None
+    params = self.fig.subplotpars
+    self.subplot_params = { name: getattr(params, name) for name in ["left", "right", "bottom", "top", "wspace", "hspace"] }
+
+  def start_plot(self, title, x_label, y_label):
+    """ Remove the previous plot and set the labels for the new one.
+        The axes are reset to the initial subplot parameters, so that the 
+        tight layout starts from the same positions as for a new figure 
+        instead of from those it found for the previous plot.
+    """
+    clear_axes([self.ax_scatter])
+    self.fig.subplots_adjust(**self.subplot_params)
+    self.ax_scatter.set_title(title)
+    self.ax_scatter.set_xlabel(x_label)
+    self.ax_scatter.set_ylabel(y_label)
+
+  def finish_plot(self, x_lim, legend_title, handles=None):
+    """ Set the limits and the legend after the data is drawn.
+        The legend entries can be given explicitly as handles.
+    """
+    self.ax_scatter.set_xlim(x_lim)
+    self.ax_scatter.legend(handles=handles, title=legend_title, ncol=3)
+
+  def close(self):
+    """ Close the figure once the layout isn't needed anymore.
+    """
+    plt.close(self.fig)
+
+#-------------------------------------------------------------------------------
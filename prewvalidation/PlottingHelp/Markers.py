@@ -0,0 +1,24 @@
+import numpy as np
+
+markers = ["o","s","D","v","^","<",">","P","X","*"]
+
+#-------------------------------------------------------------------------------
+
+def marker_indices(n_points):
+  """ Index of the marker used for each point, the markers are repeated if
+      there are more points than markers.
+  """
+  return np.arange(n_points) % len(markers)
+
+def point_markers(n_points):
+  """ Marker of each point (see marker_indices).
+  """
+  return [markers[i_marker] for i_marker in marker_indices(n_points)]
+
+def marker_groups(n_points):
+  """ Points grouped by their marker, so that all points with the same marker
+      can be drawn in one call.
+      Returns a list of the markers and the indices of their points.
+  """
+  indices = marker_indices(n_points)
+  return [(markers[i_marker], np.nonzero(indices == i_marker)[0]) for i_marker in np.unique(indices)]
@@ -0,0 +1,67 @@
+#-------------------------------------------------------------------------------
+
+""" Functions to help with writing the figures to disk.
+"""
+
+#-------------------------------------------------------------------------------
+
+# Local modules
+from prewvalidation.IO import SysHelpers as IOSH
+
+#-------------------------------------------------------------------------------
+
+# Draft output settings: collections with at least draft_min_points elements and
+# hatched patches are rasterized (with draft_raster_dpi) in vector formats and
+# low resolution PNG previews (with draft_png_dpi) are written in addition
+draft_min_points = 1000
+draft_raster_dpi = 72
+draft_png_dpi = 40
+
+def dense_artists(fig):
+  """ Find the artists of the figure that are expensive to write in vector
+      formats: dense collections (e.g. scatter layers) and hatched patches.
+  """
+  artists = []
+  for ax in fig.axes:
+    for collection in ax.collections:
+      n_elements = max(len(collection.get_offsets()), len(collection.get_paths()))
+      if n_elements >= draft_min_points:
+        artists.append(collection)
+    for patch in ax.patches:
+      if patch.get_hatch():
+        artists.append(patch)
+  return artists
+
+def save_figure(fig, output_dir, category, name, output_formats, draft=False):
+  """ Save the figure in all requested formats.
+      The figure is written to <output_dir>/<format>/<category>/<name>.<format>.
+      In draft mode dense layers are rasterized and a low resolution PNG 
+      preview is written in addition to the requested formats.
+      Returns the paths of all written files.
+  """
+  savefig_kwargs = {}
+  rasterized = []
+  if draft:
+    output_formats = list(output_formats) + ([] if "png" in output_formats else ["png"])
+    savefig_kwargs["dpi"] = draft_raster_dpi
+    rasterized = [artist for artist in dense_artists(fig) if not artist.get_rasterized()]
+    for artist in rasterized:
+      artist.set_rasterized(True)
+
+  paths = []
+  try:
+    for format in output_formats:
+      format_dir = "{}/{}/{}".format(output_dir,format,category)
+      IOSH.create_dir(format_dir)
+      path = "{}/{}.{}".format(format_dir, name, format)
+      if draft and format == "png":
+        fig.savefig(path, dpi=draft_png_dpi)
+      else:
+        fig.savefig(path, **savefig_kwargs)
+      paths.append(path)
+  finally:
+    for artist in rasterized:
+      artist.set_rasterized(False)
+  return paths
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,2 @@
+""" Helpers for the plotting style, layouts and output of the figures.
+"""
@@ -0,0 +1,281 @@
+#-------------------------------------------------------------------------------
+
+""" Driver to run a validation function on many input files, optionally
+    distributed over several worker processes.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import concurrent.futures
+import fnmatch
+import logging as log
+import os
+import re
+import sys
+import traceback
+
+# Local modules
+from prewvalidation.ValidationTests import Instrumentation as VTI
+from prewvalidation.ValidationTests import Naming as VTN
+from prewvalidation.ValidationTests import ValidationData as VTVD
+from prewvalidation.IO import Compression as IOC
+from prewvalidation.IO import MetadataIndex as IOMI
+from prewvalidation.IO import SysHelpers as IOSH
+from prewvalidation.ValidityMeasures import CommonConfig as VMCC
+
+#-------------------------------------------------------------------------------
+
+# Whether progress bars are shown in this process (disabled in the workers)
+show_progress = True
+
+def tqdm(*args, **kwargs):
+  """ Progress bar of tqdm, which is only imported when a progress bar is
+      needed (it takes long to import).
+  """
+  from tqdm import tqdm as tqdm_bar
+  return tqdm_bar(*args, **kwargs)
+
+def progress(iterable, **kwargs):
+  """ Wrap the iterable in a progress bar, unless progress bars are disabled.
+  """
+  return tqdm(iterable, disable=not show_progress, **kwargs)
+
+#-------------------------------------------------------------------------------
+
+def add_input_arguments(parser):
+  """ Add the arguments defining where the input files are searched.
+  """
+  parser.add_argument("input_dirs", nargs="*",
+                      help="Directories with the validation files (default: InputDirs in ValidityMeasures/CommonConfig.py).")
+  parser.add_argument("-r", "--recursive", action="store_true",
+                      help="Also search the subdirectories of the input directories.")
+  parser.add_argument("--include", nargs="+", default=[],
+                      help="Only use files whose name matches any of these shell-style patterns.")
+  parser.add_argument("--exclude", nargs="+", default=[],
+                      help="Skip files whose name matches any of these shell-style patterns.")
+  parser.add_argument("--include-regex", nargs="+", type=re.compile, default=[],
+                      help="Only use files whose path (relative to the input directory) matches any of these regular expressions.")
+  parser.add_argument("--exclude-regex", nargs="+", type=re.compile, default=[],
+                      help="Skip files whose path (relative to the input directory) matches any of these regular expressions.")
+
+def input_files(args, suffixes=IOC.suffixes(".csv")):
+  """ Lazily find the input files in the input directories of the parsed
+      arguments (see add_input_arguments), by default plain and compressed
+      CSV files.
+  """
+  for input_dir in args.input_dirs or VMCC.InputDirs:
+    yield from IOSH.iter_files(input_dir, suffix=suffixes, recursive=args.recursive,
+                               include=args.include + args.include_regex,
+                               exclude=args.exclude + args.exclude_regex)
+
+def parse_batch_args(description, add_arguments=None):
+  """ Parse the command line arguments common to all batch runs.
+      Further arguments can be added by the given function, which gets the
+      argument parser.
+  """
+  parser = argparse.ArgumentParser(description=description)
+  add_input_arguments(parser)
+  parser.add_argument("-j", "--workers", type=int, default=1,
+                      help="Number of worker processes (0: one per CPU).")
+  parser.add_argument("-f", "--force", action="store_true",
+                      help="Process all files, even if their outputs are up to date.")
+  parser.add_argument("--draft", action="store_true",
+                      help="Fast draft output: rasterized dense layers and low resolution PNG previews.")
+  parser.add_argument("--profile", action="store_true",
+                      help="Record the time and memory of each processing step (written next to the plots).")
+  parser.add_argument("--trace-memory", action="store_true",
+                      help="Like --profile, additionally trace the python memory allocations (slower).")
+  parser.add_argument("--cache", action="store_true",
+                      help="Cache the parsed input files and their metadata in a 'cache' directory next to the input files.")
+  selection = parser.add_argument_group("file selection", "Select the input files by their metadata (only the metadata of the files is read).")
+  selection.add_argument("--process", nargs="+",
+                         help="Process names, shell-style patterns are allowed (e.g. 'WW_*').")
+  selection.add_argument("--chirality", nargs="+", choices=[VTN.chirality_key(eM, eP) for eM in [-1,1] for eP in [-1,1]],
+                         help="Chirality combinations.")
+  selection.add_argument("--energy", type=int, nargs="+",
+                         help="Center-of-mass energies.")
+  selection.add_argument("--coordinate", nargs="+",
+                         help="Coordinate names the files must have.")
+  if add_arguments is not None:
+    add_arguments(parser)
+  args = parser.parse_args()
+  if args.workers <= 0:
+    args.workers = os.cpu_count()
+  if args.cache:
+    VMCC.UseReaderCache = True
+  return args
+
+def instrumentation_settings(args):
+  """ Instrumentation settings for run_batch from the parsed arguments (None if
+      no instrumentation is requested).
+  """
+  if not (args.profile or args.trace_memory):
+    return None
+  return { "trace": args.trace_memory }
+
+#-------------------------------------------------------------------------------
+
+def matches_selection(metadata, args):
+  """ Check whether the metadata of a file fulfills the selection criteria of
+      the parsed arguments.
+  """
+  if args.process is not None and not any(fnmatch.fnmatchcase(metadata["Name"], process) for process in args.process):
+    return False
+  if args.chirality is not None and VTN.chirality_key(metadata["e-Chirality"], metadata["e+Chirality"]) not in args.chirality:
+    return False
+  if args.energy is not None and metadata["Energy"] not in args.energy:
+    return False
+  if args.coordinate is not None and not set(args.coordinate) <= set(metadata["CoordName"]):
+    return False
+  return True
+
+def select_files(file_paths, args):
+  """ Lazily select the files whose metadata fulfills the selection criteria
+      of the parsed arguments, using the metadata index (see IO/MetadataIndex).
+      Files whose metadata can't be read are kept, so that their failure is
+      reported by the batch run.
+  """
+  if all(criterion is None for criterion in [args.process, args.chirality, args.energy, args.coordinate]):
+    yield from file_paths
+    return
+  n_files, n_selected = 0, 0
+  for file_path, metadata in IOMI.iter_metadata(file_paths, use_index=VMCC.UseReaderCache):
+    n_files += 1
+    if metadata is None or matches_selection(metadata, args):
+      n_selected += 1
+      yield file_path
+  log.info("Selected {} of {} files by their metadata.".format(n_selected, n_files))
+
+#-------------------------------------------------------------------------------
+
+def init_worker(setup, log_level, use_cache=False):
+  """ Initialise a worker process.
+      Each worker uses the non-interactive Agg backend and doesn't show its own
+      progress bars, progress is shown by the main process. The cache setting
+      of the main process is taken over (it may be changed on the command 
+      line).
+  """
+  global show_progress
+  VMCC.UseReaderCache = use_cache
+  os.environ["MPLBACKEND"] = "Agg"
+  if "matplotlib" in sys.modules: # Not imported by headless runs
+    sys.modules["matplotlib"].use("Agg")
+  show_progress = False
+  log.basicConfig(level=log_level)
+  if setup is not None:
+    setup()
+
+def run_file(function, file_path, instrumentation=None):
+  """ Run the function for a single file.
+      Returns the result of the function and None on success, and None and the
+      error traceback on failure, followed by the instrumentation records.
+      The records are also written to the plots directory of the file.
+  """
+  if instrumentation is None:
+    try:
+      return function(file_path), None, []
+    except Exception:
+      return None, traceback.format_exc(), []
+
+  result, error = None, None
+  with VTI.recording(file_path, **instrumentation) as records:
+    try:
+      result = function(file_path)
+    except Exception:
+      error = traceback.format_exc()
+  try:
+    VTI.write_records(records, VTVD.plots_dir(file_path))
+  except OSError as write_error:
+    log.warning("Could not write instrumentation records for {}: {}".format(file_path, write_error))
+  return result, error, records
+
+#-------------------------------------------------------------------------------
+
+def run_batch(function, file_paths, n_workers=1, setup=None, desc="Files",
+              incremental=None, instrumentation=None, on_result=None):
+  """ Run the function (taking a file path as argument) for all given files.
+      The files can be given lazily (e.g. by input_files), each file is 
+      started as soon as it is found.
+      Errors in single files are reported but don't stop the run.
+      With more than one worker the files are distributed over a process pool,
+      the setup function is then called once in each worker.
+      If an incremental build is given, files with up to date outputs are
+      skipped, the function must then return the paths of its outputs.
+      With instrumentation settings (see instrumentation_settings) the time
+      and memory of the processing steps are recorded and summarised.
+      The on_result function is called (in the main process) with the path
+      and the result of each successfully processed file.
+      Returns a dictionary of the failed files and their errors.
+  """
+  failures = {}
+  all_records = []
+  n_files = { "found": 0, "processed": 0 }
+
+  def counted(file_paths, counter):
+    """ Count the files passing through while iterating.
+    """
+    for file_path in file_paths:
+      n_files[counter] += 1
+      yield file_path
+
+  file_paths = counted(file_paths, "found")
+  if incremental is not None:
+    file_paths = incremental.outdated(file_paths)
+  file_paths = counted(file_paths, "processed")
+
+  def finish_file(file_path, outputs, error, records):
+    """ Record the outcome for a single file.
+    """
+    all_records.extend(records)
+    if error is not None:
+      log.error("Failed for file {}:\n{}".format(file_path, error))
+      failures[file_path] = error
+      return
+    if incremental is not None:
+      incremental.record(file_path, outputs)
+    if on_result is not None:
+      on_result(file_path, outputs)
+
+  if n_workers <= 1:
+    for file_path in tqdm(file_paths, desc=desc):
+      finish_file(file_path, *run_file(function, file_path, instrumentation))
+  else:
+    log_level = log.getLogger().getEffectiveLevel()
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=n_workers, initializer=init_worker,
+        initargs=(setup, log_level, VMCC.UseReaderCache)) as executor:
+      with tqdm(total=0, desc=desc) as progress_bar:
+        # Submit the files while they are found, the workers start directly
+        futures = {}
+        for file_path in file_paths:
+          futures[executor.submit(run_file, function, file_path, instrumentation)] = file_path
+          progress_bar.total = len(futures)
+          progress_bar.refresh()
+
+        for future in concurrent.futures.as_completed(futures):
+          file_path = futures[future]
+          try:
+            outputs, error, records = future.result()
+          except Exception:
+            # The worker itself died (e.g. killed because it ran out of memory)
+            outputs, error, records = None, traceback.format_exc(), []
+          finish_file(file_path, outputs, error, records)
+          progress_bar.update()
+
+  # Summarise the run
+  if incremental is not None:
+    log.info("Skipped {} of {} files with up to date outputs.".format(n_files["found"] - n_files["processed"], n_files["found"]))
+  if failures:
+    log.error("{} of {} files failed:".format(len(failures), n_files["processed"]))
+    for file_path in failures:
+      log.error("  {}".format(file_path))
+  else:
+    log.info("All {} files processed successfully.".format(n_files["processed"]))
+
+  if instrumentation is not None:
+    print("Time and memory of the processing steps:\n{}".format(VTI.summary(all_records)))
+
+  return failures
+
+#-------------------------------------------------------------------------------
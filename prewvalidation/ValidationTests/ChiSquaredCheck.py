@@ -0,0 +1,215 @@
+#-------------------------------------------------------------------------------
+
+""" Numeric check of the parametrisation without any plotting.
+    Calculates the same chi-squared values as ChiSquaredTest and checks for
+    each direction whether the mismodelling stays below the shift: a direction
+    passes if at most the allowed fraction of its points has a ratio
+    chi^2_mismodel / chi^2_shift above the maximum ratio. Prints a table of
+    all files and exits with a non-zero status if any file fails, e.g. for
+    gating right after the sample production.
+    Doesn't import matplotlib.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import functools
+import logging as log
+import numpy as np
+import sys
+import traceback
+
+# Local modules
+from prewvalidation.ValidationTests import BatchDriver as VTBD
+from prewvalidation.ValidationTests import Instrumentation as VTI
+from prewvalidation.ValidationTests import Streaming as VTS
+from prewvalidation.ValidationTests import ValidationData as VTVD
+from prewvalidation.ValidityMeasures import ChiSquared as VMCS
+from prewvalidation.ValidityMeasures import DeltaHelp as VMDH
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+# Deviation directions that are tested (incl. all combinations off the lines)
+dev_directions = VMDD.directions
+
+# Maximum sqrt(dc**2 + dw**2) that should be included in chi-squared calc., in
+# units of the deviation step size
+# -> Don't use outermost test values, not bad if not exact fit there
+d_max_factor = 2.0
+
+# Default pass criterion: no point with more mismodelling than shift
+default_max_ratio = 1.0
+default_max_fraction = 0.0
+
+# Exit status if any file fails the criterion or can't be processed
+exit_failed = 1
+exit_error = 2
+
+#-------------------------------------------------------------------------------
+
+def chi_squared_results(data):
+  """ Chi-squared values of all directions for the already loaded validation
+      data (see ChiSquaredTest).
+      Returns the results, the step of each result point along its direction
+      and the maximum deviation used.
+  """
+  reader = data.reader
+
+  # Get the bin content matrices for the cut histograms
+  C, P = reader["C"], reader["P"]
+  N_cut_cut0 = C[data.row_cut0]
+
+  # Find the deltas and their deviation directions
+  deltas = reader["Deltas"]
+  delta_metrics = VMDH.delta_metric(deltas)
+
+  # Maximum sqrt(dc**2 + dw**2) that should be included in chi-squared calc.
+  d_max = d_max_factor * reader["Delta"]
+
+  # Get the rows for each direction which fulfill the d_max criterium
+  with VTI.measure("select"):
+    d_max_selection = delta_metrics <= d_max
+    selections = np.logical_and(VMDD.selection_matrix(reader["DirLabel"]),d_max_selection)
+
+  # Chi squared values for all directions and deviation points
+  with VTI.measure("compute"):
+    results = VMCS.chi_squared_test(C, P, N_cut_cut0, deltas, selections, data.scale_factor)
+
+  return results, reader["DirStep"][results["row"]], d_max
+
+#-------------------------------------------------------------------------------
+
+def parse_criterion(text):
+  """ Parse a per-direction criterion "<direction>=<max ratio>[,<max fraction>]"
+      (spaces in the direction name can be written as underscores).
+      Returns the direction index, the maximum ratio and maximum fraction (None
+      if not given).
+  """
+  name, separator, values = text.partition("=")
+  names = [direction.name.replace(" ", "_") for direction in dev_directions]
+  if not separator or name.replace(" ", "_") not in names:
+    raise argparse.ArgumentTypeError("Expected <direction>=<max ratio>[,<max fraction>] with direction one of {}, got '{}'".format(", ".join(names), text))
+  try:
+    values = [float(value) for value in values.split(",")]
+  except ValueError:
+    raise argparse.ArgumentTypeError("Invalid criterion values in '{}'".format(text))
+  if len(values) > 2:
+    raise argparse.ArgumentTypeError("Too many criterion values in '{}'".format(text))
+  return names.index(name.replace(" ", "_")), values[0], values[1] if len(values) == 2 else None
+
+def direction_criteria(max_ratio=default_max_ratio, max_fraction=default_max_fraction, overrides=[]):
+  """ Maximum ratio and maximum fraction of points above it for each
+      direction, the defaults can be overridden per direction (see
+      parse_criterion).
+  """
+  max_ratios = np.full(len(dev_directions), float(max_ratio))
+  max_fractions = np.full(len(dev_directions), float(max_fraction))
+  for i_dir, dir_max_ratio, dir_max_fraction in overrides:
+    max_ratios[i_dir] = dir_max_ratio
+    if dir_max_fraction is not None:
+      max_fractions[i_dir] = dir_max_fraction
+  return max_ratios, max_fractions
+
+#-------------------------------------------------------------------------------
+
+def check_file(file_path, max_ratios, max_fractions, chunk_rows=None):
+  """ Check the chi-squared criterion for each direction of the given file.
+      With chunk_rows the file is evaluated in chunks of rows (see Streaming).
+      Returns a dictionary with the name of the file and the statistics and
+      verdict of each direction.
+  """
+  if chunk_rows is not None:
+    data = VTS.StreamingData(file_path, chunk_rows)
+    results, _, _ = VTS.streaming_test(data.reader, d_max_factor * data["Delta"], data.scale_factor)
+  else:
+    data = VTVD.ValidationData(file_path)
+    results, _, _ = chi_squared_results(data)
+
+  n_points, n_above, worst_ratio = VMCS.direction_statistics(results, max_ratios)
+  fraction_above = np.divide(n_above, n_points, out=np.zeros(len(n_points)), where=n_points > 0)
+  return {
+    "name": data.base_name,
+    "n_points": n_points,
+    "n_above": n_above,
+    "worst_ratio": worst_ratio,
+    "passed": fraction_above <= max_fractions }
+
+def format_table(checks):
+  """ Compact table of the checks: for each file and direction the worst ratio
+      and the number of points above the maximum ratio, failing directions are
+      marked with "!".
+  """
+  names = [direction.name for direction in dev_directions]
+  name_width = max([len("file")] + [len(check["name"]) for check in checks])
+  width = max(14, max(len(name) for name in names))
+  lines = ["{:{}s}  {}  result".format("file", name_width, "  ".join("{:>{}s}".format(name, width) for name in names))]
+  for check in checks:
+    cells = []
+    for i_dir in range(len(names)):
+      cell = "{:.3g} {}/{}".format(check["worst_ratio"][i_dir], check["n_above"][i_dir], check["n_points"][i_dir])
+      cells.append("{:>{}s}".format(cell if check["passed"][i_dir] else "!" + cell, width))
+    lines.append("{:{}s}  {}  {}".format(check["name"], name_width, "  ".join(cells), "pass" if np.all(check["passed"]) else "FAIL"))
+  return "\n".join(lines)
+
+#-------------------------------------------------------------------------------
+
+def add_check_arguments(parser):
+  """ Add the arguments of the pass criterion and the streaming evaluation.
+  """
+  criterion = parser.add_argument_group("pass criterion", "A direction passes if at most the maximum fraction of its points has chi^2_mismodel/chi^2_shift above the maximum ratio.")
+  criterion.add_argument("--max-ratio", type=float, default=default_max_ratio,
+                         help="Maximum ratio chi^2_mismodel/chi^2_shift of a point.")
+  criterion.add_argument("--max-fraction", type=float, default=default_max_fraction,
+                         help="Maximum fraction of points of a direction above the maximum ratio.")
+  criterion.add_argument("--direction", type=parse_criterion, nargs="+", default=[],
+                         help="Criteria of single directions, e.g. 'upper_edge=1.5,0.1' (max. ratio and optionally max. fraction).")
+  VTS.add_streaming_arguments(parser)
+
+def check_files(args):
+  """ Check the chi-squared criterion for each file selected by the parsed
+      arguments and print the table of the results.
+      Returns the exit status: exit_error if any file could not be processed
+      or no file was found at all, exit_failed if any file fails, else 0.
+  """
+  max_ratios, max_fractions = direction_criteria(args.max_ratio, args.max_fraction, args.direction)
+
+  checks = []
+  file_paths = VTBD.select_files(VTBD.input_files(args), args)
+  failures = VTBD.run_batch(functools.partial(check_file, max_ratios=max_ratios, max_fractions=max_fractions, chunk_rows=args.chunk_rows),
+                            file_paths, args.workers, instrumentation=VTBD.instrumentation_settings(args),
+                            on_result=lambda file_path, check: checks.append(check))
+
+  checks.sort(key=lambda check: check["name"])
+  n_failed = sum(not np.all(check["passed"]) for check in checks)
+  print(format_table(checks))
+  print("{} of {} files passed, {} failed, {} could not be processed.".format(len(checks) - n_failed, len(checks) + len(failures), n_failed, len(failures)))
+
+  if failures:
+    return exit_error
+  if len(checks) == 0:
+    log.error("No files were checked, check the input directories and the selection.")
+    return exit_error
+  if n_failed > 0:
+    return exit_failed
+  return 0
+
+def main():
+  """ Check the chi-squared criterion for each relevant file, exit with a
+      non-zero status if any file fails or the check can't be run.
+  """
+  log.basicConfig(level=log.WARNING) # Set logging level
+  try:
+    # Invalid arguments exit through argparse with status 2 (= exit_error)
+    args = VTBD.parse_batch_args("Check without plotting whether the parametrisation mistake stays below the shift.", add_check_arguments)
+    status = check_files(args)
+  except Exception:
+    # E.g. missing input directories, must not look like a failed criterion
+    log.error("Could not run the check:\n{}".format(traceback.format_exc()))
+    status = exit_error
+  sys.exit(status)
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
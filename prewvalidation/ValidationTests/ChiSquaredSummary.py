@@ -0,0 +1,214 @@
+#-------------------------------------------------------------------------------
+
+""" Summary of the chi-squared test over all validation files.
+    Stacks the exported chi-squared results (see ChiSquaredTest) of all files
+    into one table and calculates per category (process and chirality) and
+    global statistics of the mismodelling compared to the shift.
+"""
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import logging as log
+import matplotlib.pyplot as plt
+import numpy as np
+import os
+import pandas as pd
+
+# Local modules
+from prewvalidation.ValidationTests import BatchDriver as VTBD
+from prewvalidation.ValidationTests import ChiSquaredTest as VTCST
+from prewvalidation.ValidationTests import ValidationData as VTVD
+from prewvalidation.IO import ResultStore as IORS
+from prewvalidation.IO import SysHelpers as IOSH
+from prewvalidation.PlottingHelp import Markers as PHM
+from prewvalidation.PlottingHelp import Output as PHO
+from prewvalidation.ValidityMeasures import ChiSquared as VMCS
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+# Layout of the stacked chi-squared results of all files
+table_dtype = np.dtype([
+  ("category", np.int64), # Index of the category (see load_results)
+  ("direction", np.int64),
+  ("delta_c", np.float64),
+  ("delta_w", np.float64),
+  ("chi_sq_c0", np.float64),
+  ("chi_sq_pc", np.float64)
+])
+
+def category_name(header):
+  """ Name of the category of a result file: process, energy and chirality.
+  """
+  return "{}_{}_{}".format(header["process"], header["energy"], header["chirality"])
+
+def load_results(result_paths):
+  """ Stack the chi-squared results of the given files into one table.
+      Returns the table and the list of category names.
+  """
+  categories = []
+  tables = []
+  for path in result_paths:
+    header, rows, _ = IORS.load(path)
+    name = category_name(header)
+    if name not in categories:
+      categories.append(name)
+    table = np.empty(len(rows["direction"]), dtype=table_dtype)
+    table["category"] = categories.index(name)
+    for field in table_dtype.names[1:]:
+      table[field] = rows[field]
+    tables.append(table)
+  if not tables:
+    return np.empty(0, dtype=table_dtype), categories
+  return np.concatenate(tables), categories
+
+#-------------------------------------------------------------------------------
+
+def category_statistics(table, n_categories):
+  """ Statistics of each category, calculated for all categories at once.
+      Points above the diagonal have a larger mismodelling than shift.
+      Returns a dataframe with one row per category.
+  """
+  ratio = VMCS.mismodel_ratio(table)
+  valid = ~np.isnan(ratio)
+  above = valid & (ratio > 1.0)
+  category = table["category"]
+
+  n_points = np.bincount(category, weights=valid, minlength=n_categories)
+  n_above = np.bincount(category, weights=above, minlength=n_categories)
+
+  # Worst point of each category: last point of each category when sorted by
+  # category and ratio (invalid points first)
+  order = np.lexsort((np.where(valid, ratio, -np.inf), category))
+  sorted_categories = category[order]
+  last_in_category = np.flatnonzero(np.append(np.diff(sorted_categories) != 0, True))
+  worst = np.full(n_categories, -1)
+  worst[sorted_categories[last_in_category]] = order[last_in_category]
+  has_points = (worst >= 0) & (n_points > 0)
+
+  worst_rows = table[np.maximum(worst, 0)]
+  statistics = pd.DataFrame({
+    "n_points": n_points.astype(int),
+    "n_above": n_above.astype(int),
+    "fraction_above": np.divide(n_above, n_points, out=np.zeros(n_categories), where=n_points > 0),
+    "worst_ratio": np.where(has_points, ratio[np.maximum(worst, 0)], np.nan),
+    "worst_direction": [VMDD.directions[d].name if ok else "" for d, ok in zip(worst_rows["direction"], has_points)],
+    "worst_delta_c": np.where(has_points, worst_rows["delta_c"], np.nan),
+    "worst_delta_w": np.where(has_points, worst_rows["delta_w"], np.nan) })
+  return statistics
+
+def global_statistics(table):
+  """ Statistics over all points of all files.
+  """
+  ratio = VMCS.mismodel_ratio(table)
+  valid = ~np.isnan(ratio)
+  n_points = int(np.sum(valid))
+  return {
+    "n_points": n_points,
+    "n_above": int(np.sum(ratio[valid] > 1.0)),
+    "fraction_above": float(np.mean(ratio[valid] > 1.0)) if n_points else 0.0,
+    "worst_ratio": float(np.max(ratio[valid])) if n_points else np.nan }
+
+def summary_table(table, categories):
+  """ Table of the category statistics, ranked from worst to best category.
+  """
+  statistics = category_statistics(table, len(categories))
+  statistics.insert(0, "category", categories)
+  statistics = statistics.sort_values(["worst_ratio", "fraction_above"], ascending=False, na_position="last")
+  statistics.insert(0, "rank", np.arange(1, len(statistics)+1))
+  return statistics.reset_index(drop=True)
+
+#-------------------------------------------------------------------------------
+
+def plot_summary(table, summary, output_dir, output_formats=["pdf"]):
+  """ Summary figure: all points of all files in the chi-squared plane (left)
+      and the worst mismodel/shift ratio of each category (right).
+      Returns the paths of all written files.
+  """
+  fig, (ax_scatter, ax_rank) = plt.subplots(1, 2, figsize=(16, 0.4*len(summary) + 6), tight_layout=True,
+                                            gridspec_kw={ "width_ratios": [1, 1] })
+
+  # All points in the chi-squared plane, one collection per direction
+  valid = table["chi_sq_c0"] > 0
+  colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+  for i_dir, direction in enumerate(VMDD.directions):
+    points = table[valid & (table["direction"] == i_dir)]
+    ax_scatter.scatter(points["chi_sq_c0"], points["chi_sq_pc"], color='none', ec=colors[i_dir], lw=1.5, s=6**2,
+                       marker=PHM.markers[i_dir], label=direction.name)
+  # Same range on both axes so that the diagonal is at 45 degrees
+  chi_sq = np.concatenate((table["chi_sq_c0"][valid], table["chi_sq_pc"][valid]))
+  chi_sq = chi_sq[chi_sq > 0]
+  if len(chi_sq):
+    edge_min, edge_max = 0.5 * np.min(chi_sq), 1.5 * np.max(chi_sq)
+    ax_scatter.set_xlim(edge_min, edge_max)
+    ax_scatter.set_ylim(edge_min, edge_max)
+  ax_scatter.set_xscale('log')
+  ax_scatter.set_yscale('log')
+  ax_scatter.axline((1, 1), (10, 10), ls='--', color='black')
+  ax_scatter.set_xlabel(r"$\chi_{shift}^{2}$")
+  ax_scatter.set_ylabel(r"$\chi_{mismodel}^{2}$")
+  ax_scatter.set_title("All files")
+  ax_scatter.legend(loc="upper left")
+
+  # Ranking of the categories by their worst ratio
+  y = np.arange(len(summary))[::-1]
+  above = summary["worst_ratio"] > 1.0
+  ax_rank.barh(y, summary["worst_ratio"], color=['red' if is_above else colors[0] for is_above in above], alpha=0.7)
+  ax_rank.axvline(1.0, ls='--', color='black')
+  ax_rank.set_xscale('log')
+  worst_ratios = summary["worst_ratio"].dropna()
+  if len(worst_ratios):
+    ax_rank.set_xlim(0.5 * min(np.min(worst_ratios), 1.0), 2.0 * max(np.max(worst_ratios), 1.0))
+  ax_rank.set_yticks(y)
+  ax_rank.set_yticklabels(["{} ({:.0%} above)".format(name.replace("_", " "), fraction) for name, fraction in zip(summary["category"], summary["fraction_above"])])
+  ax_rank.set_xlabel(r"worst $\chi_{mismodel}^{2}/\chi_{shift}^{2}$")
+
+  outputs = PHO.save_figure(fig, output_dir, "ChiSquaredSummary", "ChiSquaredSummary", output_formats)
+  plt.close(fig)
+  return outputs
+
+def chi_squared_summary(output_dirs, summary_dir, output_formats=["pdf"]):
+  """ Summarise the exported chi-squared results found in the given output
+      (plots) directories. The summary figure and table are written to the
+      summary directory.
+      Returns the summary table and the global statistics.
+  """
+  result_paths = [path for output_dir in output_dirs for path in IORS.find_results(output_dir, "ChiSquared")]
+  if not result_paths:
+    raise FileNotFoundError("No chi-squared results found in {}, run the chi-squared test first.".format(output_dirs))
+  table, categories = load_results(result_paths)
+
+  summary = summary_table(table, categories)
+  global_stats = global_statistics(table)
+
+  IOSH.create_dir(summary_dir)
+  summary.to_csv(os.path.join(summary_dir, "ChiSquaredSummary.csv"), index=False)
+  plot_summary(table, summary, summary_dir, output_formats)
+
+  return summary, global_stats
+
+#-------------------------------------------------------------------------------
+
+def main():
+  """ Summarise the chi-squared test of all relevant files.
+  """
+  log.basicConfig(level=log.WARNING) # Set logging level
+  parser = argparse.ArgumentParser(description="Summarise the chi-squared test over all files.")
+  VTBD.add_input_arguments(parser)
+  parser.add_argument("-o", "--output-dir", default="summary",
+                      help="Directory the summary figure and table are written to.")
+  args = parser.parse_args()
+  VTCST.setup_plotting()
+
+  file_paths = VTBD.input_files(args)
+  output_dirs = sorted(set(VTVD.plots_dir(file_path) for file_path in file_paths))
+  summary, global_stats = chi_squared_summary(output_dirs, args.output_dir)
+
+  print(summary.to_string(index=False))
+  print("All files: {n_points} points, {n_above} ({fraction_above:.1%}) above the diagonal, worst ratio {worst_ratio:.3g}".format(**global_stats))
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,187 @@
+import functools
+import logging as log
+import numpy as np
+
+# Local modules
+from prewvalidation.ValidationTests import BatchDriver as VTBD
+from prewvalidation.ValidationTests import ChiSquaredCheck as VTCSC
+from prewvalidation.ValidationTests import Incremental as VTIB
+from prewvalidation.ValidationTests import Instrumentation as VTI
+from prewvalidation.ValidationTests import Streaming as VTS
+from prewvalidation.ValidationTests import ValidationData as VTVD
+from prewvalidation.PlottingHelp import DefaultFormat as PHDF
+from prewvalidation.PlottingHelp import Markers as PHM
+from prewvalidation.PlottingHelp import Output as PHO
+from prewvalidation.ValidityMeasures import ChiSquared as VMCS
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+# Deviation directions that are tested (incl. all combinations off the lines)
+dev_directions = VMDD.directions
+
+# Maximum sqrt(dc**2 + dw**2) that should be included in chi-squared calc., in
+# units of the deviation step size (see ChiSquaredCheck)
+d_max_factor = VTCSC.d_max_factor
+
+# Functions of other modules that compute the chi-squared results (full and
+# chunked), their source files are part of the code version of the outputs
+result_functions = [VTCSC.chi_squared_results, VTS.streaming_test]
+
+#-------------------------------------------------------------------------------
+
+def result_columns(results, steps):
+  """ Columns of the exported chi-squared results, one row per direction and
+      deviation point. The steps are those of the result points along their
+      direction.
+  """
+  return {
+    "direction": results["direction"],
+    "direction_name": np.array([dev_directions[i_dir].name for i_dir in results["direction"]], dtype=str),
+    "delta_c": results["delta_c"],
+    "delta_w": results["delta_w"],
+    "step": steps,
+    "chi_sq_c0": results["chi_sq_c0"],
+    "chi_sq_pc": results["chi_sq_pc"] }
+
+#-------------------------------------------------------------------------------
+
+def stats_columns(stats):
+  """ Columns of the exported per-bin pull statistics of the streaming 
+      evaluation, one row per direction.
+  """
+  return dict(stats,
+    direction=np.arange(len(dev_directions)),
+    direction_name=np.array([direction.name for direction in dev_directions], dtype=str))
+
+#-------------------------------------------------------------------------------
+
+def plot_chi_squared_test(file_path, output_formats=["pdf"], draft=False, chunk_rows=None):
+  """ Plot the chi-squared of the parametrisation mistake against the 
+      chi-squared of the shift due to the cut deviations.
+      With chunk_rows the file is evaluated in chunks of rows (see Streaming)
+      instead of reading it completely.
+  """
+  if chunk_rows is not None:
+    return streaming_chi_squared_stage(VTS.StreamingData(file_path, chunk_rows), output_formats, draft)
+  return chi_squared_test_stage(VTVD.ValidationData(file_path), output_formats, draft)
+
+@VTI.stage("ChiSquared")
+def chi_squared_test_stage(data, output_formats=["pdf"], draft=False):
+  """ Plot the chi-squared of the parametrisation mistake against the 
+      chi-squared of the shift for the already loaded validation data.
+      Returns the paths of all written files.
+  """
+  results, steps, d_max = VTCSC.chi_squared_results(data)
+  return export_and_plot(data, results, steps, d_max, output_formats, draft)
+
+@VTI.stage("ChiSquared")
+def streaming_chi_squared_stage(data, output_formats=["pdf"], draft=False):
+  """ Plot the chi-squared of the parametrisation mistake against the 
+      chi-squared of the shift for validation data that is evaluated in 
+      chunks (see Streaming), additionally export the per-bin pull statistics.
+      Returns the paths of all written files.
+  """
+  d_max = d_max_factor * data["Delta"]
+  results, steps, stats = VTS.streaming_test(data.reader, d_max, data.scale_factor)
+  with VTI.measure("export"):
+    stats_path = data.save_results("PullStats", stats_columns(stats), data.bin_columns())
+  return export_and_plot(data, results, steps, d_max, output_formats, draft) + [stats_path]
+
+def export_and_plot(data, results, steps, d_max, output_formats=["pdf"], draft=False):
+  """ Export the chi-squared results and plot them.
+      Returns the paths of all written files.
+  """
+  import matplotlib.pyplot as plt # Only imported when plotting, it takes long to import
+  reader = data.reader
+  output_dir = data.output_dir
+  base_name = data.base_name
+  
+  chi_sq_pc = [VMCS.direction_results(results,i_dir)["chi_sq_pc"] for i_dir in range(len(dev_directions))]
+  chi_sq_c0 = [VMCS.direction_results(results,i_dir)["chi_sq_c0"] for i_dir in range(len(dev_directions))]
+  
+  # Export the chi-squared values for later aggregation
+  with VTI.measure("export"):
+    result_path = data.save_results("ChiSquared", result_columns(results, steps))
+
+  # --- Plotting ---------------------------------------------------------------
+
+  name = "{}_ChiSquared".format(base_name)
+  with VTI.measure("render", figure=name):
+    # start with a rectangular Figure
+    fig = plt.figure(figsize=(7.5, 6), tight_layout=True)
+  
+    ax_scatter = plt.gca()
+    ax_scatter.set_title(data.title)
+    ax_scatter.set_xlabel(r"$\chi_{shift}^{2}$", fontsize=26)
+    ax_scatter.set_ylabel(r"$\chi_{mismodel}^{2}$", fontsize=26)
+    # ax_scatter.set_xlabel(r"$\chi_{shift}^{2} = \sum_{bins} \left(\frac{N_{cut}^{(\Delta c, \Delta w)} - N_{cut}^{0}}{\sqrt{N_{cut}^{0}}}\right)^2$")
+    # ax_scatter.set_ylabel(r"$\chi_{par}^{2} = \sum_{bins} \left(\frac{N_{par}^{(\Delta c, \Delta w)} - N_{cut}^{(\Delta c, \Delta w)}}{\sqrt{N_{cut}^{(\Delta c, \Delta w)}}}\right)^2$")
+  
+    # Set logarithmic axes 
+    x_min = min([min(c) for c in chi_sq_c0])
+    x_max = max([max(c) for c in chi_sq_c0])
+    y_min = min([min(c) for c in chi_sq_pc])
+    y_max = max([max(c) for c in chi_sq_pc])
+    edge_min = 0.5 * y_min
+    edge_max = 1.5 * max(x_max,y_max)
+    log_edge_min = np.log10(edge_min)
+    log_edge_max = np.log10(edge_max)
+    edges = np.logspace(log_edge_min, log_edge_max, 16)
+    ax_scatter.set_yscale('log')
+    ax_scatter.set_xscale('log')
+    ax_scatter.set_ylim(edge_min,edge_max)
+    ax_scatter.set_xlim(edge_min,edge_max)
+
+    # Draw diagonal axis line, everything below that line is fine
+    ax_scatter.fill_between(edges,edges,edge_max*np.ones(16),color='red',alpha=0.5)
+    ax_scatter.axline((edge_min, edge_min), (edge_max, edge_max), ls='--', color='black')
+
+    colors =  plt.rcParams['axes.prop_cycle'].by_key()['color']
+
+    for i_dir in range(len(dev_directions)):
+      scatter = ax_scatter.scatter(chi_sq_c0[i_dir], chi_sq_pc[i_dir], 
+                  color='none', ec=colors[i_dir], lw=2, s=10**2, 
+                  marker=PHM.markers[i_dir], label=dev_directions[i_dir].name)
+
+    legend_title = r"$\cos\theta_{{\mu}}^{{cut}}={}$,".format(reader["Coef|MuonAcc_CutValue"]) + "\n" + r"$\sqrt{{\Delta c^2 + \Delta w^2}} \leq {}\delta$".format(d_max/reader["Delta"])
+    ax_scatter.legend(title=legend_title, loc="upper left")
+  
+  # Save the figure in all requested formats
+  with VTI.measure("save", figure=name):
+    outputs = PHO.save_figure(fig, output_dir, "ChiSquared", name, output_formats, draft)
+  outputs.append(result_path)
+  
+  plt.close(fig)
+  
+  return outputs
+  
+    
+#-------------------------------------------------------------------------------
+
+def setup_plotting():
+  """ Set the plotting style used for the chi-squared plots.
+  """
+  import matplotlib.pyplot as plt
+  PHDF.set_default_mpl_format()
+  
+  # Set a useful font size
+  plt.rcParams.update({'font.size': 17})
+
+def main():
+  """ Run the cut effect plotting for each relevant file.
+  """
+  log.basicConfig(level=log.WARNING) # Set logging level
+  args = VTBD.parse_batch_args("Test the significance of the mistake made by the parametrisation.", VTS.add_streaming_arguments)
+  setup_plotting()
+
+  file_paths = VTBD.select_files(VTBD.input_files(args), args)
+  version = VTIB.code_version([plot_chi_squared_test] + result_functions, { "output_formats": ["pdf"], "draft": args.draft, "chunk_rows": args.chunk_rows })
+  incremental = VTIB.IncrementalBuild("ChiSquaredTest", version, force=args.force)
+  VTBD.run_batch(functools.partial(plot_chi_squared_test, draft=args.draft, chunk_rows=args.chunk_rows), file_paths, args.workers, setup=setup_plotting, incremental=incremental,
+                 instrumentation=VTBD.instrumentation_settings(args))
+      
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import functools
+import logging as log
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Local modules
+from prewvalidation.ValidationTests import BatchDriver as VTBD
+from prewvalidation.ValidationTests import Incremental as VTIB
+from prewvalidation.ValidationTests import Instrumentation as VTI
+from prewvalidation.ValidationTests import Naming as VTN
+from prewvalidation.ValidationTests import ValidationData as VTVD
+from prewvalidation.PlottingHelp import DefaultFormat as PHDF
+from prewvalidation.PlottingHelp import Output as PHO
+
+#-------------------------------------------------------------------------------
+
+def plot_cut_effect(file_path, output_formats=["pdf"], draft=False):
+  """ Plot the (absolute) effect of the cos(theta) cut on the distributions.
+  """
+  return cut_effect_stage(VTVD.ValidationData(file_path), output_formats, draft)
+
+@VTI.stage("CutEffect")
+def cut_effect_stage(data, output_formats=["pdf"], draft=False):
+  """ Plot the (absolute) effect of the cos(theta) cut on the distributions of
+      the already loaded validation data.
+      Returns the paths of all written files.
+  """
+  reader = data.reader
+  output_dir = data.output_dir
+  base_name = data.base_name
+  
+  n_dims = data.n_dims
+
+  # Find the MC event histograms
+  y_nocut = reader["NoCutData"]
+  y_cut = reader["C"][data.row_cut0].astype(np.float64)
+  # y_par = reader["P"][data.row_cut0].astype(np.float64)
+  
+  # Correctly normalise the MC event histograms
+  y_nocut = y_nocut * data.scale_factor
+  y_cut = y_cut * data.scale_factor
+  # y_par = y_par * data.scale_factor
+  
+  # Project the histograms onto each dimension
+  projections = data.projection.project([y_nocut, y_cut])
+  
+  # Create the test histograms
+  outputs = []
+  for d in VTBD.progress(range(n_dims), desc="Dim.", leave=False):
+    # Find the binning x range
+    x_edges = data.bin_edges[d]
+    y_nocut_proj, y_cut_proj = projections[d]
+    coord_name = "${}$".format(VTN.name_to_coord(reader["CoordName"][d]))
+    name = "{}_{}_CutEffect".format(base_name, reader["CoordName"][d])
+    
+    with VTI.measure("render", figure=name):
+      # Create the figure
+      fig, ax = plt.subplots(figsize=(8.5,6))#, tight_layout=True)
+      # title = "{} : {}{}".format(reader["Name"],VTN.eM_chirality(reader["e-Chirality"]),VTN.eP_chirality(reader["e+Chirality"]))
+      ax.set_title(data.title)
+    
+      # Create the plots (no cut, actual cut, parametrised cut)
+      colors =  plt.rcParams['axes.prop_cycle'].by_key()['color']
+      h_kwargs = { "width": np.diff(x_edges), "align": "edge", "fill": False, "lw": 2}
+      hist_nocut = ax.bar(x_edges[:-1], y_nocut_proj, label="Before cut", ec=colors[0], hatch="//", **h_kwargs)#, ec='black', fill=False)
+      hist_cut = ax.bar(x_edges[:-1], y_cut_proj, label="After cut", ec=colors[1], hatch="\\\\", **h_kwargs)#, ec='#CC3311', fill=False, hatch="//")
+      # hist_par = plt.hist(x_vals, bins=x_edges, weights=y_par, label="Param. cut", ec='#009988', fill=False, hatch="\\\\")
+    
+      # Some nicer plotting
+      ax.set_xlabel(coord_name)
+      ax.set_ylabel("#Events")
+      ax.set_xlim((x_edges[0],x_edges[-1]))
+      # ax.set_ylim([0,1.1*np.amax(hist_nocut[0])])
+      ax.legend(title=r"$\cos\theta_{{\mu}}^{{cut}}={}$".format(reader["Coef|MuonAcc_CutValue"]))
+      fig.tight_layout(rect=[0, 0, 0.95, 1.0])
+    
+    # Save the figure in all requested formats
+    with VTI.measure("save", figure=name):
+      outputs += PHO.save_figure(fig, output_dir, "CutEffect", name, output_formats, draft)
+      
+    plt.close(fig)
+    
+  return outputs
+
+#-------------------------------------------------------------------------------
+
+def setup_plotting():
+  """ Set the plotting style used for the cut effect plots.
+  """
+  PHDF.set_default_mpl_format()
+  
+  # Change the hatch linewidth, only possible on global level
+  mpl.rcParams['hatch.linewidth'] = 1.5
+
+def main():
+  """ Run the cut effect plotting for each relevant file.
+  """
+  log.basicConfig(level=log.WARNING) # Set logging level
+  args = VTBD.parse_batch_args("Plot the effect of the cut on the distributions.")
+  setup_plotting()
+
+  file_paths = VTBD.select_files(VTBD.input_files(args), args)
+  version = VTIB.code_version([plot_cut_effect], { "output_formats": ["pdf"], "draft": args.draft })
+  incremental = VTIB.IncrementalBuild("CutEffect", version, force=args.force)
+  VTBD.run_batch(functools.partial(plot_cut_effect, draft=args.draft), file_paths, args.workers, setup=setup_plotting, incremental=incremental,
+                 instrumentation=VTBD.instrumentation_settings(args))
+      
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
\ No newline at end of file
@@ -0,0 +1,240 @@
+import functools
+import logging as log
+import matplotlib.collections as mcollections
+import matplotlib.markers as mmarkers
+import matplotlib.transforms as mtransforms
+import numpy as np
+
+# Local modules
+from prewvalidation.ValidationTests import BatchDriver as VTBD
+from prewvalidation.ValidationTests import Incremental as VTIB
+from prewvalidation.ValidationTests import Instrumentation as VTI
+from prewvalidation.ValidationTests import Naming as VTN
+from prewvalidation.ValidationTests import ValidationData as VTVD
+from prewvalidation.PlottingHelp import Colors as PHC
+from prewvalidation.PlottingHelp import DefaultFormat as PHDF
+from prewvalidation.PlottingHelp import Histograms as PHH
+from prewvalidation.PlottingHelp import Layouts as PHL
+from prewvalidation.PlottingHelp import Markers as PHM
+from prewvalidation.PlottingHelp import Output as PHO
+from prewvalidation.ValidityMeasures import DeltaHelp as VMDH
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+# Deviation directions that are tested
+dev_directions = VMDD.line_directions
+
+def ratio(a,b,default=0.0):
+  """ Calculate ratio between two arrays, if denominator point is 0 set default.
+  """
+  return np.where(np.abs(b)>0.00000001,a/b,default)
+
+#-------------------------------------------------------------------------------
+
+def legend_handles(point_colors, point_labels):
+  """ Legend entries of the deviation points, needed because the points are
+      not drawn one artist per point.
+      The entries are scatter collections with the properties of the drawn
+      points, so that the legend draws them like the legend of a scatter plot
+      (a line marker would sit at another height in the legend entry).
+  """
+  handles = []
+  for marker, color, label in zip(PHM.point_markers(len(point_labels)), point_colors, point_labels):
+    marker_style = mmarkers.MarkerStyle(marker)
+    path = marker_style.get_path().transformed(marker_style.get_transform())
+    handle = mcollections.PathCollection([path], sizes=[10**2], facecolors='none', edgecolors=[color], linewidths=2, label=label)
+    handle.set_transform(mtransforms.IdentityTransform()) # As set by scatter
+    handles.append(handle)
+  return handles
+
+def draw_deviations(layout, x, x_bin_edges, diffs, counts_x, point_colors):
+  """ Draw the deviations of each point (rows of diffs) into the given layout,
+      including the marginal histograms if the layout has them.
+      The squared deviations projected onto x (counts_x) are precomputed.
+      The points are drawn with one scatter collection per marker, the 
+      histograms of all points are drawn as one collection per axis.
+  """
+  # Common plotting arguments
+  common_sc_kwargs = { "color":'none', "linewidths": 2 , "s": 10**2}
+  common_hist_kwargs = { "linewidths" : 2 }
+  
+  n_rows, n_bins = diffs.shape
+  for marker, rows in PHM.marker_groups(n_rows):
+    edgecolors = np.repeat(point_colors[rows], n_bins, axis=0)
+    layout.ax_scatter.scatter(np.tile(x, len(rows)), diffs[rows].ravel(), edgecolors=edgecolors, marker=marker, **common_sc_kwargs)
+  
+  if layout.ax_histx is not None:
+    PHH.draw_step_histograms(layout.ax_histx, x_bin_edges, counts_x, point_colors, **common_hist_kwargs)
+  if layout.ax_histy is not None:
+    y_bin_edges = np.linspace(np.amin(diffs), np.amax(diffs), 20)
+    counts_y = PHH.histograms(diffs, y_bin_edges)
+    PHH.draw_step_histograms(layout.ax_histy, y_bin_edges, counts_y, point_colors, orientation='horizontal', **common_hist_kwargs)
+
+#-------------------------------------------------------------------------------
+
+def plot_deviation_test(file_path, output_formats=["pdf"], draft=False):
+  """ Plot the (absolute) effect of the cos(theta) cut on the distributions.
+  """
+  return deviation_test_stage(VTVD.ValidationData(file_path), output_formats, draft)
+
+@VTI.stage("Deviation")
+def deviation_test_stage(data, output_formats=["pdf"], draft=False):
+  """ Plot the effects of the deviations in the cut on the distributions of the
+      already loaded validation data.
+      Returns the paths of all written files.
+  """
+  reader = data.reader
+  output_dir = data.output_dir
+  base_name = data.base_name
+  
+  # Get the bin content matrices for the cut histograms
+  C, P = reader["C"], reader["P"]
+  scale_factor = data.scale_factor
+
+  bin_centers = data.bin_centers
+  n_dims = data.n_dims
+  
+  # Row converted to double precision independent of the storage type
+  N_cut_cut0 = C[data.row_cut0].astype(np.float64)
+  
+  # Find the bin edges for each dimension
+  bin_edges = data.bin_edges
+  
+  # Find the deltas and the minimum and maximum deviations
+  deltas = reader["Deltas"]
+  delta_metrics = VMDH.delta_metric(deltas)
+  colors = PHC.ColorSpectrum("turbo",-1.1*np.amax(delta_metrics),1.1*np.amax(delta_metrics))
+  
+  # Figure layouts, created once and reused for all plots of this file
+  layout = PHL.ScatterHistLayout()
+  scatter_layout = PHL.ScatterLayout()
+  
+  outputs = []
+  exported = []
+  for i_dir, dev_dir in enumerate(VTBD.progress(dev_directions, desc="Dev. dir. loop", leave=False)):
+    log.debug("Looking at direction {}".format(dev_dir.name))
+    dev_dir_name = dev_dir.name.replace(" ", "_")
+    with VTI.measure("select"):
+      dir_selection = VMDD.direction_rows(reader["DirLabel"], i_dir)
+      deltas_in_dir = reader["DirStep"][dir_selection]
+      
+      # Matrices of shape (n_dir_points, n_bins)
+      N_cut = np.asarray(C[dir_selection], dtype=np.float64)
+      N_par = np.asarray(P[dir_selection], dtype=np.float64)
+    
+    with VTI.measure("compute"):
+      diff_c0 = np.sqrt(scale_factor) * ratio(N_cut - N_cut_cut0, np.sqrt(N_cut_cut0)) 
+      diff_p0 = np.sqrt(scale_factor) * ratio(N_par - N_cut_cut0, np.sqrt(N_cut_cut0)) 
+      diff_pc = np.sqrt(scale_factor) * ratio(N_par - N_cut, np.sqrt(N_cut)) 
+      
+      # Squared deviations projected onto each dimension
+      proj_c0 = data.projection.project(diff_c0**2)
+      proj_p0 = data.projection.project(diff_p0**2)
+      proj_pc = data.projection.project(diff_pc**2)
+    
+    exported.append({
+      "direction": np.full(len(dir_selection), i_dir),
+      "direction_name": np.full(len(dir_selection), dev_dir.name),
+      "delta_c": deltas[dir_selection,0],
+      "delta_w": deltas[dir_selection,1],
+      "step": deltas_in_dir,
+      "diff_c0": diff_c0,
+      "diff_p0": diff_p0,
+      "diff_pc": diff_pc })
+    
+    title = data.title
+    legend_title = "Shift {}\n$\Delta {}$ $[\delta={}]$".format(dev_dir.name,dev_dir.coord, reader["Delta"])
+    
+    # Color and legend label of each point in the direction
+    point_colors = colors[deltas_in_dir]
+    point_labels = [r"${}$".format(delta/reader["Delta"]) for delta in deltas_in_dir]
+    handles = legend_handles(point_colors, point_labels)
+    
+    for d in VTBD.progress(range(n_dims), desc="Dim. loop", leave=False):
+      x = bin_centers[:,d]
+      x_lim = (bin_edges[d][0], bin_edges[d][-1])
+      coord_name = "${}$".format(VTN.name_to_coord(reader["CoordName"][d]))
+      
+      #--- Plot N_cut - N_cut0 -------------------------------------------------
+      
+      name = "{}_{}_DevCutCut0_{}".format(base_name, reader["CoordName"][d], dev_dir_name)
+      with VTI.measure("render", figure=name):
+        layout.start_plot(title, coord_name, r"$\left(N_{cut}^{(\Delta c,\Delta w)} - N_{cut}^{0}\right)/\sqrt{N_{cut}^{0}}$")
+        draw_deviations(layout, x, bin_edges[d], diff_c0, proj_c0[d], point_colors)
+        layout.finish_plot(x_lim, legend_title, handles)
+      
+      # Save the figure in all requested formats
+      with VTI.measure("save", figure=name):
+        outputs += PHO.save_figure(layout.fig, output_dir, "DevCutCut0", name, output_formats, draft)
+      
+      #--- Only scatter plot N_cut - N_cut0 ------------------------------------
+      
+      name = "{}_{}_DevCutCut0_ScatterOnly_{}".format(base_name, reader["CoordName"][d], dev_dir_name)
+      with VTI.measure("render", figure=name):
+        scatter_layout.start_plot(title, coord_name, r"$\left(N_{cut}^{(\Delta c,\Delta w)} - N_{cut}^{0}\right)/\sqrt{N_{cut}^{0}}$")
+        draw_deviations(scatter_layout, x, bin_edges[d], diff_c0, proj_c0[d], point_colors)
+        scatter_layout.finish_plot(x_lim, legend_title, handles)
+      
+      # Save the figure in all requested formats
+      with VTI.measure("save", figure=name):
+        outputs += PHO.save_figure(scatter_layout.fig, output_dir, "DevCutCut0", name, output_formats, draft)
+      
+      #--- Plot N_par - N_cut0 -------------------------------------------------
+      
+      name = "{}_{}_DevParCut0_{}".format(base_name, reader["CoordName"][d], dev_dir_name)
+      with VTI.measure("render", figure=name):
+        layout.start_plot(title, coord_name, r"$\left(N_{par}^{(\Delta c,\Delta w)} - N_{cut}^{0}\right)/\sqrt{N_{cut}^{0}}$")
+        draw_deviations(layout, x, bin_edges[d], diff_p0, proj_p0[d], point_colors)
+        layout.finish_plot(x_lim, legend_title, handles)
+      
+      # Save the figure in all requested formats
+      with VTI.measure("save", figure=name):
+        outputs += PHO.save_figure(layout.fig, output_dir, "DevParCut0", name, output_formats, draft)
+      
+      #--- Plot N_par - N_cut --------------------------------------------------
+      
+      name = "{}_{}_DevParCut_{}".format(base_name, reader["CoordName"][d], dev_dir_name)
+      with VTI.measure("render", figure=name):
+        layout.start_plot(title, coord_name, r"$\left(N_{par}^{(\Delta c,\Delta w)} - N_{cut}^{(\Delta c,\Delta w)}\right)/\sqrt{N_{cut}^{(\Delta c,\Delta w)}}$")
+        draw_deviations(layout, x, bin_edges[d], diff_pc, proj_pc[d], point_colors)
+        layout.finish_plot(x_lim, legend_title, handles)
+      
+      # Save the figure in all requested formats
+      with VTI.measure("save", figure=name):
+        outputs += PHO.save_figure(layout.fig, output_dir, "DevParCut", name, output_formats, draft)
+      
+  layout.close()
+  scatter_layout.close()
+  
+  # Export the pulls of all directions for later aggregation
+  with VTI.measure("export"):
+    row_columns = { name: np.concatenate([columns[name] for columns in exported]) for name in exported[0] }
+    outputs.append(data.save_results("Deviation", row_columns, data.bin_columns()))
+  
+  return outputs
+      
+#-------------------------------------------------------------------------------
+
+def setup_plotting():
+  """ Set the plotting style used for the deviation plots.
+  """
+  PHDF.set_default_mpl_format()
+
+def main():
+  """ Run the cut effect plotting for each relevant file.
+  """
+  log.basicConfig(level=log.WARNING) # Set logging level
+  args = VTBD.parse_batch_args("Plot the effects of deviations in the cut.")
+  setup_plotting()
+
+  file_paths = VTBD.select_files(VTBD.input_files(args), args)
+  version = VTIB.code_version([plot_deviation_test], { "output_formats": ["pdf"], "draft": args.draft })
+  incremental = VTIB.IncrementalBuild("DeviationTest", version, force=args.force)
+  VTBD.run_batch(functools.partial(plot_deviation_test, draft=args.draft), file_paths, args.workers, setup=setup_plotting, desc="File loop", incremental=incremental,
+                 instrumentation=VTBD.instrumentation_settings(args))
+      
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
\ No newline at end of file
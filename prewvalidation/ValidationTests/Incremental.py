@@ -0,0 +1,205 @@
+#-------------------------------------------------------------------------------
+
+""" Incremental rebuilding of the validation outputs.
+    A manifest file in each plots directory records for each output file the
+    stage and input file that wrote it, the state of the input file, the
+    version of the code and configuration, and the state of the output file
+    itself. Input files whose outputs are all up to date can then be skipped.
+"""
+
+#-------------------------------------------------------------------------------
+
+import glob
+import hashlib
+import inspect
+import json
+import logging as log
+import os
+
+# Local modules
+from prewvalidation.ValidationTests import ValidationData as VTVD
+from prewvalidation.IO import SysHelpers as IOSH
+
+#-------------------------------------------------------------------------------
+
+manifest_name = "manifest.json"
+
+# Directory containing all python code of this repository
+code_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code that all stages depend on
+common_code = [
+  "{}/IO/*.py".format(code_dir),
+  "{}/PlottingHelp/*.py".format(code_dir),
+  "{}/ValidityMeasures/*.py".format(code_dir),
+  "{}/ValidationTests/Naming.py".format(code_dir),
+  "{}/ValidationTests/ValidationData.py".format(code_dir)
+]
+
+#-------------------------------------------------------------------------------
+
+def file_state(file_path):
+  """ State of the input file (size and modification time).
+  """
+  stat = os.stat(file_path)
+  return { "size": stat.st_size, "mtime_ns": stat.st_mtime_ns }
+
+def code_version(functions, options=None):
+  """ Version identifier of the code and configuration that produce outputs.
+      Hash of the source files defining the given functions, of the common
+      code and of the given options. Decorated functions are unwrapped, so
+      that the file defining the function itself is hashed, not the one of 
+      the decorator.
+  """
+  source_files = [inspect.getsourcefile(inspect.unwrap(function)) for function in functions]
+  for pattern in common_code:
+    source_files += sorted(glob.glob(pattern))
+
+  version_hash = hashlib.sha1()
+  for source_file in source_files:
+    with open(source_file, "rb") as source:
+      version_hash.update(source.read())
+  version_hash.update(json.dumps(options, sort_keys=True).encode())
+  return version_hash.hexdigest()
+
+#-------------------------------------------------------------------------------
+
+class Manifest:
+  """ Class for the manifest file of one output directory.
+      The entries are keyed by the path of the output file relative to the
+      output directory. A manifest that can't be read (e.g. truncated by an
+      interrupted run, or of an older format) is treated as empty.
+  """
+  format_version = 2
+
+  def __init__(self,output_dir):
+    self.output_dir = output_dir
+    self.path = os.path.join(output_dir, manifest_name)
+    self.entries = self.load()
+    self.builds = {} # Entries of the builds recorded by this process
+
+  def load(self):
+    """ Read the entries of the manifest file.
+    """
+    try:
+      with open(self.path, "r") as manifest_file:
+        content = json.load(manifest_file)
+      if content["format"] == self.format_version:
+        return content["outputs"]
+    except FileNotFoundError:
+      return {}
+    except (OSError, ValueError, KeyError, TypeError) as error:
+      log.warning("Ignoring unreadable manifest {}: {}".format(self.path, error))
+      return {}
+    log.warning("Ignoring manifest {} of another format".format(self.path))
+    return {}
+
+  def output_path(self, name):
+    """ Path of the output file of the given entry name.
+    """
+    return os.path.join(self.output_dir, name)
+
+  def entry_name(self, output_path):
+    """ Entry name of the given output file.
+    """
+    return os.path.relpath(output_path, self.output_dir)
+
+  def build_entries(self, stage, input_name):
+    """ Entries of the outputs written by the stage for the input file.
+    """
+    return { name: entry for name, entry in self.entries.items()
+             if entry["stage"] == stage and entry["input"] == input_name }
+
+  def record(self, stage, input_name, entries):
+    """ Replace the entries of the outputs written by the stage for the input
+        file.
+    """
+    for name in self.build_entries(stage, input_name):
+      del self.entries[name]
+    self.entries.update(entries)
+    self.builds[(stage, input_name)] = entries
+
+  def save(self):
+    """ Write the manifest, replacing the old one only once fully written.
+        The builds recorded by this process are merged into the current 
+        manifest file, so that processes writing to the same directory keep
+        each other's entries.
+    """
+    self.entries = self.load()
+    for (stage, input_name), entries in self.builds.items():
+      for name in self.build_entries(stage, input_name):
+        del self.entries[name]
+      self.entries.update(entries)
+    with IOSH.atomic_write(self.path) as manifest_file:
+      json.dump({ "format": self.format_version, "outputs": self.entries }, manifest_file, indent=1, sort_keys=True)
+
+#-------------------------------------------------------------------------------
+
+class IncrementalBuild:
+  """ Class deciding which input files need to be (re-)processed by a stage.
+      An input file is up to date if it didn't change, the code version is the
+      same and each of its previous outputs still exists unchanged.
+  """
+  def __init__(self,key,version,force=False):
+    self.key = key
+    self.version = version
+    self.force = force
+    self.manifests = {}
+
+  def manifest(self, file_path):
+    """ Get the manifest of the output directory of the given input file.
+    """
+    output_dir = VTVD.plots_dir(file_path)
+    if output_dir not in self.manifests:
+      self.manifests[output_dir] = Manifest(output_dir)
+    return self.manifests[output_dir]
+
+  def is_up_to_date(self, file_path):
+    """ Check if the outputs of the given input file are up to date.
+    """
+    if self.force:
+      return False
+    manifest = self.manifest(file_path)
+    entries = manifest.build_entries(self.key, os.path.basename(file_path))
+    if len(entries) == 0:
+      return False
+    input_state = file_state(file_path)
+    for name, entry in entries.items():
+      output_path = manifest.output_path(name)
+      if not (entry["input_state"] == input_state and
+              entry["version"] == self.version and
+              entry["n_outputs"] == len(entries) and # None taken over by another stage
+              os.path.isfile(output_path) and
+              entry["output_state"] == file_state(output_path)):
+        return False
+    return True
+
+  def record(self, file_path, outputs):
+    """ Record the outputs of a successfully processed input file.
+    """
+    manifest = self.manifest(file_path)
+    input_state = file_state(file_path)
+    outputs = list(outputs)
+    entries = {}
+    for order, output in enumerate(outputs):
+      entries[manifest.entry_name(output)] = {
+        "stage": self.key,
+        "input": os.path.basename(file_path),
+        "input_state": input_state,
+        "version": self.version,
+        "output_state": file_state(output),
+        "order": order,
+        "n_outputs": len(outputs) }
+    manifest.record(self.key, os.path.basename(file_path), entries)
+    manifest.save()
+
+  def outdated(self, file_paths):
+    """ Lazily select the input files that need to be processed.
+    """
+    for file_path in file_paths:
+      if self.is_up_to_date(file_path):
+        log.debug("Skipping up to date file {}".format(file_path))
+      else:
+        yield file_path
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,165 @@
+#-------------------------------------------------------------------------------
+
+""" Timing and memory instrumentation of the validation stages.
+    While recording, each measured step (read, select, compute, render, save)
+    adds a record with its wall time and memory usage, tagged with the file,
+    the stage and (where applicable) the figure it belongs to.
+    Memory is measured as the maximum resident set size of the process, with
+    tracemalloc additionally as the peak memory allocated by python during the
+    step.
+"""
+
+#-------------------------------------------------------------------------------
+
+import contextlib
+import datetime
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+  import resource
+except ImportError: # Not available on Windows
+  resource = None
+
+#-------------------------------------------------------------------------------
+
+records_name = "instrumentation.jsonl"
+
+# State of the recording in this process
+enabled = False
+trace_memory = False
+context = {}
+records = []
+
+# Open tracemalloc measurements, innermost last
+_memory_stack = []
+
+# Unit of the maximum resident set size of getrusage in bytes: bytes on macOS,
+# kilobytes on Linux
+rss_unit = 1 if sys.platform == "darwin" else 1024
+
+#-------------------------------------------------------------------------------
+
+def max_rss_MB():
+  """ Maximum resident set size of this process so far in MB (None if not
+      available).
+  """
+  if resource is None:
+    return None
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit / 1024.0**2
+
+@contextlib.contextmanager
+def measure(step, **info):
+  """ Measure wall time and memory of the enclosed block as the given step.
+      Additional info (e.g. the figure name) is added to the record.
+      Does nothing if no recording is active.
+  """
+  if not enabled:
+    yield
+    return
+
+  if trace_memory:
+    # Keep the peak of the enclosing measurement before resetting it
+    current, peak = tracemalloc.get_traced_memory()
+    if _memory_stack:
+      _memory_stack[-1]["peak"] = max(_memory_stack[-1]["peak"], peak)
+    tracemalloc.reset_peak()
+    _memory_stack.append({ "start": current, "peak": current })
+
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    record = dict(context, step=step, **info)
+    record["wall_s"] = time.perf_counter() - start
+    record["max_rss_MB"] = max_rss_MB()
+    if trace_memory:
+      frame = _memory_stack.pop()
+      frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+      record["peak_MB"] = (frame["peak"] - frame["start"]) / 1e6
+      if _memory_stack:
+        _memory_stack[-1]["peak"] = max(_memory_stack[-1]["peak"], frame["peak"])
+      tracemalloc.reset_peak()
+    records.append(record)
+
+def stage(name):
+  """ Decorator for stage functions: tags all records of the stage with its
+      name and measures the full stage as step "stage".
+  """
+  def decorator(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+      previous = context.get("stage")
+      context["stage"] = name
+      try:
+        with measure("stage"):
+          return function(*args, **kwargs)
+      finally:
+        context["stage"] = previous
+    return wrapper
+  return decorator
+
+#-------------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def recording(file_path, trace=False):
+  """ Record all measurements made while processing the given input file,
+      with trace the python memory allocations are traced (tracemalloc).
+      Yields the list of records.
+  """
+  global enabled, trace_memory, records, context
+  enabled = True
+  trace_memory = trace
+  records = []
+  context = { "file": os.path.basename(file_path) }
+  started_tracing = trace and not tracemalloc.is_tracing()
+  if started_tracing:
+    tracemalloc.start()
+  try:
+    with measure("file"):
+      yield records
+  finally:
+    if started_tracing:
+      tracemalloc.stop()
+    enabled = False
+
+def write_records(file_records, output_dir):
+  """ Append the records to the JSON lines file in the given directory.
+  """
+  os.makedirs(output_dir, exist_ok=True)
+  run = datetime.datetime.now().isoformat(timespec="seconds")
+  with open(os.path.join(output_dir, records_name), "a") as records_file:
+    for record in file_records:
+      records_file.write(json.dumps(dict(record, run=run), sort_keys=True) + "\n")
+
+#-------------------------------------------------------------------------------
+
+def summary(all_records):
+  """ Summary table of the records of a batch run: per stage and step the
+      number of measurements, the total and maximum wall time and the maximum
+      memory.
+  """
+  totals = {}
+  for record in all_records:
+    key = (record.get("stage") or "-", record["step"])
+    total = totals.setdefault(key, { "n": 0, "wall_s": 0.0, "max_wall_s": 0.0, "max_rss_MB": None, "peak_MB": None })
+    total["n"] += 1
+    total["wall_s"] += record["wall_s"]
+    total["max_wall_s"] = max(total["max_wall_s"], record["wall_s"])
+    for memory in ["max_rss_MB", "peak_MB"]:
+      if record.get(memory) is not None:
+        total[memory] = max(total[memory] or 0.0, record[memory])
+
+  format_MB = lambda value: "{:10.1f}".format(value) if value is not None else "{:>10s}".format("-")
+  lines = ["{:12s} {:8s} {:>6s} {:>10s} {:>10s} {:>10s} {:>10s}".format("stage", "step", "n", "total [s]", "max [s]", "RSS [MB]", "peak [MB]")]
+  for (stage_name, step), total in sorted(totals.items(), key=lambda item: -item[1]["wall_s"]):
+    lines.append("{:12s} {:8s} {:6d} {:10.3f} {:10.3f} {} {}".format(
+      stage_name, step, total["n"], total["wall_s"], total["max_wall_s"],
+      format_MB(total["max_rss_MB"]), format_MB(total["peak_MB"])))
+  return "\n".join(lines)
+
+#-------------------------------------------------------------------------------
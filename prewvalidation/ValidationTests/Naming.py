@@ -23,6 +23,15 @@ def eP_chirality(chirality_int):
   else:
     raise ValueError("Unknown e+ chirality {}".format(chirality_int))
 
+def chirality_key(eM_chirality_int, eP_chirality_int):
+  """ Short key of the chirality combination as used in the file names 
+      (e.g. eLpR).
+  """
+  keys = { -1: "L", +1: "R" }
+  if eM_chirality_int not in keys or eP_chirality_int not in keys:
+    raise ValueError("Unknown chiralities {}, {}".format(eM_chirality_int, eP_chirality_int))
+  return "e{}p{}".format(keys[eM_chirality_int], keys[eP_chirality_int])
+
 #-------------------------------------------------------------------------------
 
 def determine_finalstate(name):
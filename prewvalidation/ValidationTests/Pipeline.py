@@ -0,0 +1,100 @@
+#-------------------------------------------------------------------------------
+
+""" Pipeline that reads each validation file only once and runs any selection
+    of the validation stages (cut effect, deviation test, chi-squared test) on
+    the shared data.
+"""
+
+#-------------------------------------------------------------------------------
+
+import functools
+import logging as log
+import matplotlib as mpl
+
+# Local modules
+from prewvalidation.ValidationTests import BatchDriver as VTBD
+from prewvalidation.ValidationTests import ChiSquaredTest as VTCST
+from prewvalidation.ValidationTests import CutEffect as VTCE
+from prewvalidation.ValidationTests import DeviationTest as VTDT
+from prewvalidation.ValidationTests import Incremental as VTIB
+from prewvalidation.ValidationTests import ValidationData as VTVD
+
+#-------------------------------------------------------------------------------
+
+class Stage:
+  """ Class defines one step of the pipeline.
+      The function gets the ValidationData of a file (and the output options),
+      the setup function sets the plotting style of the stage. The outputs
+      also depend on the source files of the given dependencies (functions of
+      other modules the stage uses).
+  """
+  def __init__(self,name,function,setup=None,dependencies=[]):
+    self.name = name
+    self.function = function
+    self.setup = setup
+    self.dependencies = list(dependencies)
+
+  def run(self, data, **kwargs):
+    """ Run the stage on the given data.
+        The plotting style of the stage doesn't leak into other stages.
+    """
+    with mpl.rc_context():
+      if self.setup is not None:
+        self.setup()
+      return self.function(data, **kwargs)
+
+# Registry of the available stages, further stages can be added using 
+# register_stage
+stages = {}
+
+def register_stage(stage):
+  """ Make the given stage available in the pipeline.
+  """
+  stages[stage.name] = stage
+
+register_stage(Stage("CutEffect", VTCE.cut_effect_stage, VTCE.setup_plotting))
+register_stage(Stage("Deviation", VTDT.deviation_test_stage, VTDT.setup_plotting))
+register_stage(Stage("ChiSquared", VTCST.chi_squared_test_stage, VTCST.setup_plotting, VTCST.result_functions))
+
+#-------------------------------------------------------------------------------
+
+def run_pipeline(file_path, stage_names=None, output_formats=["pdf"], draft=False):
+  """ Read the given file once and run the selected stages on it (default: all
+      registered stages).
+      Returns the paths of all written files.
+  """
+  if stage_names is None:
+    stage_names = list(stages)
+  data = VTVD.ValidationData(file_path)
+  outputs = []
+  for stage_name in stage_names:
+    log.debug("Running stage {} on {}".format(stage_name, file_path))
+    outputs += stages[stage_name].run(data, output_formats=output_formats, draft=draft)
+  return outputs
+
+#-------------------------------------------------------------------------------
+
+def add_pipeline_arguments(parser):
+  """ Add the pipeline specific command line arguments.
+  """
+  parser.add_argument("-s", "--stages", nargs="+", choices=list(stages),
+                      default=list(stages), help="Stages to run.")
+
+def main():
+  """ Run the selected validation stages for each relevant file.
+  """
+  log.basicConfig(level=log.WARNING) # Set logging level
+  args = VTBD.parse_batch_args("Run the validation stages with a single read per file.", add_pipeline_arguments)
+
+  file_paths = VTBD.select_files(VTBD.input_files(args), args)
+  pipeline = functools.partial(run_pipeline, stage_names=args.stages, draft=args.draft)
+  stage_functions = [function for stage_name in args.stages for function in [stages[stage_name].function] + stages[stage_name].dependencies]
+  version = VTIB.code_version([run_pipeline] + stage_functions, { "output_formats": ["pdf"], "draft": args.draft })
+  incremental = VTIB.IncrementalBuild("Pipeline[{}]".format(",".join(args.stages)), version, force=args.force)
+  VTBD.run_batch(pipeline, file_paths, args.workers, incremental=incremental,
+                 instrumentation=VTBD.instrumentation_settings(args))
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
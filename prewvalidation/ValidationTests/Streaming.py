@@ -0,0 +1,155 @@
+#-------------------------------------------------------------------------------
+
+""" Streaming evaluation of validation files whose data doesn't fit into
+    memory at once.
+    The data section is read twice in chunks of rows: the first pass finds the
+    reference point (delta-c = delta-w = 0) and for each direction the range of
+    the cut bin contents, which defines the bins affected by the cut. The
+    second pass accumulates the chi-squared values of each point and per-bin
+    statistics of the pulls of each direction. Only one chunk and the
+    (n_directions, n_bins) accumulators are held in memory, independent of the
+    number of deviation points.
+"""
+
+#-------------------------------------------------------------------------------
+
+import logging as log
+import numpy as np
+
+# Local modules
+from prewvalidation.ValidationTests import Instrumentation as VTI
+from prewvalidation.ValidationTests import ValidationData as VTVD
+from prewvalidation.IO import Reader as IOR
+from prewvalidation.ValidityMeasures import ChiSquared as VMCS
+from prewvalidation.ValidityMeasures import CommonConfig as VMCC
+from prewvalidation.ValidityMeasures import DeltaHelp as VMDH
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+default_chunk_rows = 100
+
+class StreamingData(VTVD.ValidationData):
+  """ Validation data whose distributions are only read in chunks of rows (see
+      IO/Reader.ChunkedReader). Provides all quantities of ValidationData that
+      only depend on the metadata, the distributions are evaluated with
+      streaming_test.
+  """
+
+  # --- Constructor ------------------------------------------------------------
+
+  def __init__(self,file_path,chunk_rows=default_chunk_rows):
+    log.debug("Reading metadata of file: {}".format(file_path))
+    self.file_path = file_path
+    with VTI.measure("read"):
+      self.reader = IOR.ChunkedReader(file_path, chunk_rows, bin_storage=VMCC.BinStorage)
+    self.interpret_metadata()
+
+#-------------------------------------------------------------------------------
+
+def classify_chunk(chunk, delta, d_max, rel_tolerance=1e-6):
+  """ Classify the deviation points of a chunk.
+      Returns the step of each point along its direction, the (n_directions,
+      n_points) selections of all points of each direction and of those used
+      for the chi-squared (within d_max), and the mask of reference points.
+  """
+  deltas = chunk["Deltas"]
+  tolerance = rel_tolerance * abs(delta)
+  labels, steps = VMDD.classify(deltas, tolerance)
+  all_selections = VMDD.selection_matrix(labels)
+  selections = np.logical_and(all_selections, VMDH.delta_metric(deltas) <= d_max)
+  reference = np.all(np.abs(deltas) <= tolerance, axis=1)
+  return steps, all_selections, selections, reference
+
+def scan_chunks(reader, d_max, rel_tolerance=1e-6):
+  """ First pass: find the reference cut histogram and the bins affected by
+      the cut in each direction (those whose content is not the same for all
+      points used for the direction).
+  """
+  n_directions, n_bins = len(VMDD.directions), IOR.total_bins(reader)
+  N_cut_cut0 = None
+  N_min = np.full((n_directions, n_bins), np.inf)
+  N_max = np.full((n_directions, n_bins), -np.inf)
+
+  for chunk in reader.chunks():
+    _, _, selections, reference = classify_chunk(chunk, reader["Delta"], d_max, rel_tolerance)
+    if N_cut_cut0 is None and np.any(reference):
+      N_cut_cut0 = chunk["C"][np.argmax(reference)].copy()
+    for i_dir, dir_selection in enumerate(selections):
+      if np.any(dir_selection):
+        N_min[i_dir] = np.minimum(N_min[i_dir], np.amin(chunk["C"][dir_selection], axis=0))
+        N_max[i_dir] = np.maximum(N_max[i_dir], np.amax(chunk["C"][dir_selection], axis=0))
+
+  if N_cut_cut0 is None:
+    raise ValueError("No reference point (delta-c = delta-w = 0) found.")
+  affected = (N_min != N_cut_cut0) | (N_max != N_cut_cut0)
+  affected &= np.isfinite(N_min) # Directions without any point
+  return N_cut_cut0, affected
+
+def pulls(N, N_ref, scale_factor):
+  """ Deviation of the bin contents from the reference in units of the
+      expected statistical uncertainty of the reference (0 for empty bins).
+      Calculated in double precision independent of the storage type.
+  """
+  N, N_ref = np.asarray(N, dtype=np.float64), np.asarray(N_ref, dtype=np.float64)
+  sqrt_N_ref = np.sqrt(N_ref)
+  return np.sqrt(scale_factor) * np.divide(N - N_ref, sqrt_N_ref, out=np.zeros(np.broadcast(N, N_ref).shape), where=np.abs(sqrt_N_ref) > 0.00000001)
+
+def streaming_test(reader, d_max, scale_factor, rel_tolerance=1e-6):
+  """ Evaluate the chi-squared test (see ValidityMeasures/ChiSquared) in two
+      passes over the chunks of the reader.
+      Returns the chi-squared results (ordered like chi_squared_test), the step
+      of each result point along its direction and the per-bin pull statistics
+      of each direction.
+  """
+  with VTI.measure("scan"):
+    N_cut_cut0, affected = scan_chunks(reader, d_max, rel_tolerance)
+
+  n_directions, n_bins = affected.shape
+  stats = { "n_points": np.zeros(n_directions, dtype=np.int64) }
+  for name in ["sum_sq_pull_c0", "sum_sq_pull_pc", "max_abs_pull_c0", "max_abs_pull_pc"]:
+    stats[name] = np.zeros((n_directions, n_bins))
+
+  chunk_results = []
+  chunk_steps = []
+  first_row = 0
+  with VTI.measure("compute"):
+    for chunk in reader.chunks():
+      N_cut, N_par = chunk["C"], chunk["P"]
+      steps, all_selections, selections, _ = classify_chunk(chunk, reader["Delta"], d_max, rel_tolerance)
+
+      # Chi-squared of the points used for each direction
+      contrib_c0, contrib_pc, empty_mismatch = VMCS.bin_contributions(N_cut, N_par, N_cut_cut0)
+      VMCS.warn_empty_bins(empty_mismatch, chunk["Deltas"], selections)
+      results = VMCS.selected_results(contrib_c0, contrib_pc, affected, chunk["Deltas"], selections, scale_factor, first_row)
+      chunk_results.append(results)
+      chunk_steps.append(steps[results["row"] - first_row])
+
+      # Pull statistics of all points of each direction
+      pull_c0 = pulls(N_cut, N_cut_cut0, scale_factor)
+      pull_pc = pulls(N_par, N_cut, scale_factor)
+      stats["n_points"] += np.sum(all_selections, axis=1)
+      stats["sum_sq_pull_c0"] += all_selections.astype(np.float64) @ pull_c0**2
+      stats["sum_sq_pull_pc"] += all_selections.astype(np.float64) @ pull_pc**2
+      for i_dir, dir_selection in enumerate(all_selections):
+        if np.any(dir_selection):
+          stats["max_abs_pull_c0"][i_dir] = np.maximum(stats["max_abs_pull_c0"][i_dir], np.amax(np.abs(pull_c0[dir_selection]), axis=0))
+          stats["max_abs_pull_pc"][i_dir] = np.maximum(stats["max_abs_pull_pc"][i_dir], np.amax(np.abs(pull_pc[dir_selection]), axis=0))
+
+      first_row += len(N_cut)
+
+    # Order by direction (then by row) as the full evaluation does
+    results = np.concatenate(chunk_results)
+    steps = np.concatenate(chunk_steps)
+    order = np.argsort(results["direction"], kind="stable")
+  return results[order], steps[order], stats
+
+#-------------------------------------------------------------------------------
+
+def add_streaming_arguments(parser):
+  """ Add the arguments of the streaming evaluation.
+  """
+  parser.add_argument("--chunk-rows", type=int, default=None,
+                      help="Evaluate the files in chunks of this many rows instead of reading them completely (bounded memory for very large files).")
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,122 @@
+#-------------------------------------------------------------------------------
+
+""" Content of one validation file together with the derived quantities that
+    are shared by all validation stages.
+"""
+
+#-------------------------------------------------------------------------------
+
+import logging as log
+import numpy as np
+import os
+
+# Local modules
+from prewvalidation.ValidationTests import Instrumentation as VTI
+from prewvalidation.ValidationTests import Naming as VTN
+from prewvalidation.IO import Compression as IOC
+from prewvalidation.IO import Reader as IOR
+from prewvalidation.IO import ResultStore as IORS
+from prewvalidation.PlottingHelp import Histograms as PHH
+from prewvalidation.ValidityMeasures import CommonConfig as VMCC
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+def plots_dir(file_path):
+  """ Directory in which the plots of the given input file are stored.
+  """
+  return "{}/plots".format(os.path.dirname(file_path))
+
+#-------------------------------------------------------------------------------
+
+class ValidationData:
+  """ Class that reads a validation file once and calculates the quantities
+      that all validation stages need.
+  """
+
+  # --- Constructor ------------------------------------------------------------
+
+  def __init__(self,file_path):
+    # Read the input file
+    log.debug("Reading file: {}".format(file_path))
+    self.file_path = file_path
+    with VTI.measure("read"):
+      self.reader = IOR.Reader(file_path, use_cache=VMCC.UseReaderCache, bin_storage=VMCC.BinStorage)
+    self.interpret_metadata()
+
+    with VTI.measure("select"):
+      # Find the reference point without deviation in the cut
+      self.row_cut0 = self.reader.cut0_row()
+
+      # Classify the deviation points into the deviation directions
+      VMDD.add_direction_index(self.reader)
+
+  def interpret_metadata(self):
+    """ Calculate the quantities that only depend on the metadata of the file.
+    """
+    reader = self.reader
+
+    # Output info
+    self.output_dir = plots_dir(self.file_path)
+    self.base_name = IOC.strip_compression(os.path.basename(self.file_path)).replace("_valdata.csv","")
+    log.debug("Output will be written to: {}".format(self.output_dir))
+
+    # Get scale factor to normalise distribution to the (roughly) number of
+    # events expected during the fit
+    self.scale_factor = VMCC.TestLumi * reader["CrossSection"] / reader["NTotalMC"]
+
+    # Find the bin edges for each dimension and the projection of the 
+    # multi-dimensional bins onto them
+    self.bin_centers = reader["BinCenters"]
+    self.n_bins = IOR.total_bins(reader)
+    self.n_dims = len(reader["CoordName"])
+    self.projection = PHH.BinProjection(self.bin_centers, reader["CoordMin"], reader["CoordMax"], reader["CoordNBins"])
+    self.bin_edges = self.projection.bin_edges
+
+    # Title used for all plots of this file
+    self.title = "{}, ${}$ab$^{{-1}}$".format(VTN.metadata_to_process(reader),VMCC.TestLumi/1000)
+
+  # --- Access functions -------------------------------------------------------
+
+  def __getitem__(self,index):
+    """ Define what happens when the [] operator is applied (only reading).
+        Gives access to the content of the reader.
+    """
+    return self.reader[index]
+
+  # --- Result export ----------------------------------------------------------
+
+  def result_header(self):
+    """ Metadata identifying the results of this file.
+    """
+    reader = self.reader
+    return {
+      "source": os.path.basename(self.file_path),
+      "process": reader["Name"],
+      "energy": int(reader["Energy"]),
+      "e-Chirality": int(reader["e-Chirality"]),
+      "e+Chirality": int(reader["e+Chirality"]),
+      "chirality": VTN.chirality_key(reader["e-Chirality"], reader["e+Chirality"]),
+      "coord_names": [str(name) for name in reader["CoordName"]],
+      "delta": float(reader["Delta"]),
+      "scale_factor": float(self.scale_factor) }
+
+  def save_results(self, kind, row_columns, bin_columns={}):
+    """ Export the results of the given kind (see IO/ResultStore) into the
+        results directory next to the plots.
+        Returns the path of the written file.
+    """
+    path = IORS.result_path(self.output_dir, self.base_name, kind)
+    IORS.save(path, kind, self.result_header(), row_columns, bin_columns)
+    return path
+
+  def bin_columns(self):
+    """ Bin columns describing the histogram bins: index and center in each
+        coordinate.
+    """
+    columns = { "bin": np.arange(self.n_bins) }
+    for d, name in enumerate(self.reader["CoordName"]):
+      columns["center:{}".format(name)] = self.bin_centers[:,d]
+    return columns
+
+#-------------------------------------------------------------------------------
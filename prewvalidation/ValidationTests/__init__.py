@@ -0,0 +1,3 @@
+""" Validation stages, the batch driver running them over many files and the
+    numeric check.
+"""
@@ -0,0 +1,146 @@
+#-------------------------------------------------------------------------------
+
+""" Vectorized calculation of the chi-squared values that compare the cut
+    histograms with the reference histogram (chi^2_shift) and the
+    parametrisation with the cut histogram (chi^2_mismodel).
+"""
+
+#-------------------------------------------------------------------------------
+
+import logging as log
+import numpy as np
+
+#-------------------------------------------------------------------------------
+
+# Layout of the chi-squared results, one entry per (direction, deviation point)
+result_dtype = np.dtype([
+  ("direction", np.int64), # Index of the deviation direction
+  ("row", np.int64), # Row of the deviation point in the input arrays
+  ("delta_c", np.float64),
+  ("delta_w", np.float64),
+  ("chi_sq_c0", np.float64), # Cut histogram vs. reference cut histogram
+  ("chi_sq_pc", np.float64) # Parametrisation vs. cut histogram
+])
+
+#-------------------------------------------------------------------------------
+
+def warn_empty_bins(empty_mismatch, deltas, selections):
+  """ Warn about bins that are empty for the cut but not for the
+      parametrisation, for each selected point of each direction.
+  """
+  bad_rows = np.flatnonzero(np.any(empty_mismatch, axis=1))
+  if len(bad_rows) == 0:
+    return
+  for dir_selection in selections:
+    for row in bad_rows[dir_selection[bad_rows]]:
+      for b in np.flatnonzero(empty_mismatch[row]):
+        log.warning("Bin {} at deviation ({}) has 0 for cut and non-0 for parametrisation".format(b,deltas[row]))
+
+def bin_contributions(N_cut, N_par, N_cut_cut0):
+  """ Chi-squared contributions of each bin for each deviation point: the cut
+      histogram vs. the reference (c0) and the parametrisation vs. the cut 
+      histogram (pc), both of shape (n_points, n_bins).
+      Bins without cut events don't contribute, the mask of those that are 
+      empty for the cut but not for the parametrisation is returned as well.
+  """
+  # Accumulate in double precision independent of the storage type
+  N_cut = np.asarray(N_cut, dtype=np.float64)
+  N_par = np.asarray(N_par, dtype=np.float64)
+  N_cut_cut0 = np.asarray(N_cut_cut0, dtype=np.float64)
+
+  diff_pc_sq = (N_par - N_cut)**2
+  diff_c0_sq = (N_cut - N_cut_cut0)**2
+
+  filled = N_cut > 0
+  contrib_pc = np.divide(diff_pc_sq, N_cut, out=np.zeros_like(N_cut), where=filled)
+  contrib_c0 = np.divide(diff_c0_sq, N_cut_cut0, out=np.zeros_like(N_cut), where=filled)
+  return contrib_c0, contrib_pc, ~filled & (diff_pc_sq > 0)
+
+def chi_squared_test(N_cut, N_par, N_cut_cut0, deltas, selections, scale_factor=1.0):
+  """ Calculate chi^2_shift and chi^2_mismodel for all selected deviation
+      points of all directions.
+
+      N_cut, N_par: (n_points, n_bins) arrays of the cut and parametrised bins
+      N_cut_cut0: (n_bins) array of the reference cut bins (no deviation)
+      deltas: (n_points, 2) array of the [delta-c, delta-w] pairs
+      selections: (n_directions, n_points) boolean array, which points are
+                  used for which direction
+      scale_factor: Normalisation of the bin contents (the chi-squared values
+                    scale linearly with it)
+
+      Bins that are empty for the cut histogram are skipped (with a warning if
+      the parametrisation is not empty). For each direction the bins that are
+      unaffected by the cut (same content for all points of that direction) are
+      skipped as well.
+
+      Returns a structured array of type result_dtype with one entry for each
+      selected point in each direction (ordered by direction, then by row).
+  """
+  selections = np.asarray(selections, dtype=bool)
+
+  # Chi-squared contributions of each bin, shape (n_points, n_bins)
+  contrib_c0, contrib_pc, empty_mismatch = bin_contributions(N_cut, N_par, N_cut_cut0)
+  warn_empty_bins(empty_mismatch, deltas, selections)
+
+  # Find the bins that are affected by the cut for at least one point of the
+  # direction, shape (n_directions, n_bins)
+  changed = (N_cut != N_cut_cut0).astype(np.float64)
+  affected = (selections.astype(np.float64) @ changed) > 0
+
+  return selected_results(contrib_c0, contrib_pc, affected, deltas, selections, scale_factor)
+
+def selected_results(contrib_c0, contrib_pc, affected, deltas, selections, scale_factor=1.0, first_row=0):
+  """ Sum the bin contributions over the affected bins of each direction and
+      collect the results of the selected points (see chi_squared_test).
+      The rows can be a chunk of all rows starting at first_row.
+  """
+  # Sum over the affected bins of each direction, shape (n_points, n_directions)
+  affected = affected.astype(np.float64).T
+  chi_sq_pc = scale_factor * (contrib_pc @ affected)
+  chi_sq_c0 = scale_factor * (contrib_c0 @ affected)
+
+  # Collect the results of the selected points
+  directions, rows = np.nonzero(selections)
+  results = np.zeros(len(rows), dtype=result_dtype)
+  results["direction"] = directions
+  results["row"] = first_row + rows
+  results["delta_c"] = deltas[rows,0]
+  results["delta_w"] = deltas[rows,1]
+  results["chi_sq_c0"] = chi_sq_c0[rows,directions]
+  results["chi_sq_pc"] = chi_sq_pc[rows,directions]
+  return results
+
+def direction_results(results, i_dir):
+  """ Get the chi-squared results of the direction with the given index.
+  """
+  return results[results["direction"] == i_dir]
+
+#-------------------------------------------------------------------------------
+
+def mismodel_ratio(results):
+  """ Ratio chi^2_mismodel / chi^2_shift of each point, NaN for points without
+      shift (e.g. the reference point).
+  """
+  return np.divide(results["chi_sq_pc"], results["chi_sq_c0"], out=np.full(len(results), np.nan), where=results["chi_sq_c0"] > 0)
+
+def direction_statistics(results, max_ratios):
+  """ Statistics of the mismodel/shift ratio of each direction, calculated for
+      all directions at once.
+      max_ratios: (n_directions) array of the ratio above which a point of the
+      direction counts as badly modelled
+      Returns the number of points with shift, the number of badly modelled
+      points and the worst ratio (NaN without points) of each direction.
+  """
+  n_directions = len(max_ratios)
+  ratio = mismodel_ratio(results)
+  valid = ~np.isnan(ratio)
+  directions = results["direction"][valid]
+  ratio = ratio[valid]
+
+  n_points = np.bincount(directions, minlength=n_directions)
+  n_above = np.bincount(directions[ratio > max_ratios[directions]], minlength=n_directions)
+  worst_ratio = np.full(n_directions, np.nan)
+  np.fmax.at(worst_ratio, directions, ratio)
+  return n_points, n_above, worst_ratio
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,26 @@
+""" Store common configurations used for all validity tests.
+"""
+
+#-------------------------------------------------------------------------------
+
+TestLumi = 1000 # 1 ab^-1
+
+# Store parsed input files in a binary cache (see IO/ReaderCache) and their 
+# metadata in an index (see IO/MetadataIndex), both in a "cache" directory 
+# inside the input directories. Off by default so that the input directories
+# aren't modified, can be switched on with --cache.
+UseReaderCache = False
+
+# Storage type of the bin contents in memory (see IO/Reader): "float64", 
+# "float32" (half the memory) or "integer" (integer cut bin contents only), the
+# chi-squared values are always accumulated in double precision
+BinStorage = "float64"
+
+# Directories with the validation files, used if no input directories are 
+# given on the command line
+InputDirs = [
+  "/home/jakob/DESY/MountPoints/DUST/TGCAnalysis/SampleProduction/NewMCProduction/2f_Z_l/PrEWInput/MuAcc_costheta_0.9925/validation",
+  "/home/jakob/DESY/MountPoints/DUST/TGCAnalysis/SampleProduction/NewMCProduction/4f_WW_sl/PrEWInput/validation"
+]
+
+#-------------------------------------------------------------------------------
\ No newline at end of file
@@ -0,0 +1,102 @@
+#-------------------------------------------------------------------------------
+
+""" Classification of the deviation points delta=(delta-c,delta-w) into the
+    deviation directions that are tested.
+"""
+
+#-------------------------------------------------------------------------------
+
+import numpy as np
+
+#-------------------------------------------------------------------------------
+
+class DevDirection:
+  """ Class defines one deviation direction.
+      The points of a direction fulfill normal * delta = 0, the signed step of
+      a point along the direction is step * delta.
+  """
+  def __init__(self,name,coord,normal=None,step=None):
+    self.name = name
+    self.coord = coord
+    self.normal = normal
+    self.step = step
+
+# Library of the deviation directions along lines through the reference point
+line_directions = (
+  DevDirection("center", "c", normal=(0.0,1.0), step=(1.0,0.0)),
+  DevDirection("width", "w", normal=(1.0,0.0), step=(0.0,1.0)),
+  DevDirection("upper edge", "x_{{up}}", normal=(1.0,-0.5), step=(1.0,0.5)),
+  DevDirection("lower edge", "x_{{low}}", normal=(1.0,0.5), step=(1.0,-0.5))
+)
+
+# All points that are not on any of the lines
+combinations = DevDirection("combinations", None)
+
+# All directions, the index of a direction is its label
+directions = line_directions + (combinations,)
+
+# Special labels
+reference_label = -1 # Point without deviation, part of all line directions
+combinations_label = len(line_directions)
+
+#-------------------------------------------------------------------------------
+
+def classify(deltas, tolerance):
+  """ Classify the given (n_points, 2) array of [delta-c, delta-w] pairs.
+      Points are considered on a line if their distance from it (in units of
+      the normal vector) is at most the given tolerance.
+      Returns the direction label of each point and its signed step along the
+      direction (0 for the reference point, NaN for combinations).
+  """
+  deltas = np.asarray(deltas, dtype=np.float64)
+  normals = np.array([direction.normal for direction in line_directions])
+  step_vectors = np.array([direction.step for direction in line_directions])
+
+  # Check all points against all lines at once, shape (n_points, n_lines)
+  on_line = np.abs(deltas @ normals.T) <= tolerance
+  on_any_line = np.any(on_line, axis=1)
+  labels = np.where(on_any_line, np.argmax(on_line, axis=1), combinations_label)
+
+  all_steps = deltas @ step_vectors.T
+  line_labels = np.minimum(labels, len(line_directions) - 1)
+  steps = np.where(on_any_line, all_steps[np.arange(len(deltas)),line_labels], np.nan)
+
+  # The reference point lies on all lines
+  reference = np.all(np.abs(deltas) <= tolerance, axis=1)
+  labels[reference] = reference_label
+  steps[reference] = 0.0
+
+  return labels, steps
+
+def add_direction_index(reader, rel_tolerance=1e-6):
+  """ Classify all deviation points of the reader once and store the labels
+      ("DirLabel") and steps along the direction ("DirStep") in its data.
+      The tolerance is relative to the deviation step size of the file.
+  """
+  labels, steps = classify(reader["Deltas"], rel_tolerance * abs(reader["Delta"]))
+  reader.data["DirLabel"] = labels
+  reader.data["DirStep"] = steps
+
+#-------------------------------------------------------------------------------
+
+def direction_mask(labels, label):
+  """ Boolean mask of the points that belong to the direction with the given
+      label. The reference point belongs to all line directions.
+  """
+  mask = labels == label
+  if label != combinations_label:
+    mask |= labels == reference_label
+  return mask
+
+def direction_rows(labels, label):
+  """ Indices of the points that belong to the direction with the given label.
+  """
+  return np.flatnonzero(direction_mask(labels, label))
+
+def selection_matrix(labels):
+  """ Boolean (n_directions, n_points) array defining which point belongs to
+      which direction (for all directions incl. combinations).
+  """
+  return np.array([direction_mask(labels, label) for label in range(len(directions))])
+
+#-------------------------------------------------------------------------------
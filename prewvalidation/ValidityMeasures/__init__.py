@@ -0,0 +1,2 @@
+""" Measures of the validity of the parametrisation and common configuration.
+"""
@@ -0,0 +1,4 @@
+""" Validation of the cut systematics parametrisation used in PrEW.
+    The subpackages are only imported when needed, so that importing the
+    package itself stays cheap (see cli for the command line interface).
+"""
@@ -0,0 +1,7 @@
+""" Allow running the command line interface with python -m prewvalidation.
+"""
+
+from prewvalidation import cli
+
+if __name__ == "__main__":
+  cli.main()
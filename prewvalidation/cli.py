@@ -0,0 +1,57 @@
+#-------------------------------------------------------------------------------
+
+""" Command line interface of all validation steps.
+    Only the module of the requested command is imported, so that e.g. the
+    numeric check starts without loading matplotlib.
+"""
+
+#-------------------------------------------------------------------------------
+
+import importlib
+import sys
+
+#-------------------------------------------------------------------------------
+
+# Module and description of each command, the module must provide main()
+commands = {
+  "cut-effect": ("prewvalidation.ValidationTests.CutEffect", "Find the absolute effect of the base cut on the distribution."),
+  "deviation": ("prewvalidation.ValidationTests.DeviationTest", "Effects of changes in the cut."),
+  "chi-squared": ("prewvalidation.ValidationTests.ChiSquaredTest", "Test the significance of the mistake made by the parametrisation."),
+  "pipeline": ("prewvalidation.ValidationTests.Pipeline", "Run several stages with a single read of each file."),
+  "summary": ("prewvalidation.ValidationTests.ChiSquaredSummary", "Summarise the chi-squared test over all files."),
+  "check": ("prewvalidation.ValidationTests.ChiSquaredCheck", "Check without plotting whether the parametrisation passes (non-zero exit status if not).")
+}
+
+#-------------------------------------------------------------------------------
+
+def usage(prog):
+  """ Usage message listing all commands.
+  """
+  width = max(len(command) for command in commands)
+  lines = ["usage: {} <command> [arguments]".format(prog), "", "commands:"]
+  lines += ["  {:{}s}  {}".format(command, width, description) for command, (_, description) in commands.items()]
+  lines += ["", "Use '{} <command> -h' for the arguments of a command.".format(prog)]
+  return "\n".join(lines)
+
+def main(argv=None):
+  """ Run the main function of the requested command with the remaining
+      arguments.
+  """
+  argv = sys.argv if argv is None else argv
+  prog = "prew-validation"
+  if len(argv) < 2 or argv[1] in ["-h", "--help"]:
+    print(usage(prog))
+    return
+  command = argv[1]
+  if command not in commands:
+    print(usage(prog), file=sys.stderr)
+    sys.exit("{}: unknown command '{}'".format(prog, command))
+
+  module = importlib.import_module(commands[command][0])
+  sys.argv = ["{} {}".format(prog, command)] + list(argv[2:])
+  module.main()
+
+#-------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+  main()
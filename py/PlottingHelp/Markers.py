@@ -1 +0,0 @@
-markers = ["o","s","D","v","^","<",">","P","X","*"]
\ No newline at end of file
@@ -1,8 +0,0 @@
-""" Store common configurations used for all validity tests.
-"""
-
-#-------------------------------------------------------------------------------
-
-TestLumi = 1000 # 1 ab^-1
-
-#-------------------------------------------------------------------------------
\ No newline at end of file
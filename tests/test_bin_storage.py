@@ -0,0 +1,208 @@
+#-------------------------------------------------------------------------------
+
+""" Tests of the bin storage types of the reader (see IO/Reader).
+    The bin contents and chi-squared values of every storage are compared to
+    a reference that doesn't use the reader: the CSV text parsed in double
+    precision and the chi-squared values summed bin by bin as the chi-squared
+    test did before it was vectorized.
+"""
+
+#-------------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+# Local modules
+from prewvalidation.Benchmarks import SyntheticData as BMSD
+from prewvalidation.IO import CSVMetadataReader as CMR
+from prewvalidation.IO import Reader as IOR
+from prewvalidation.ValidationTests import ChiSquaredCheck as VTCSC
+from prewvalidation.ValidationTests import Streaming as VTS
+from prewvalidation.ValidityMeasures import ChiSquared as VMCS
+from prewvalidation.ValidityMeasures import DeltaHelp as VMDH
+from prewvalidation.ValidityMeasures import Directions as VMDD
+
+#-------------------------------------------------------------------------------
+
+# Maximum relative deviation of the chi-squared values from the reference.
+# Double precision only differs by the order of the summation. float32 keeps
+# ~7 significant digits of the bin contents, chi^2_mismodel depends on the
+# small difference of P and C and loses about two more.
+chi_squared_rtol = { "float64": 1e-12, "float32": 1e-4, "integer": 1e-4 }
+
+# Maximum relative deviation of the stored bin contents: the CSV parser of
+# pandas may differ from python's exact parsing in the last bit, float32
+# rounds to ~7 significant digits
+bin_rtol = { "float64": 1e-15, "float32": 1e-7, "integer": 1e-7 }
+
+# Type of the stored cut and parametrisation bin contents
+bin_dtypes = { "float64": (np.float64, np.float64),
+               "float32": (np.float32, np.float32),
+               "integer": (np.int32, np.float32) }
+
+#-------------------------------------------------------------------------------
+
+# Bins of the 6x4 grid left out of the masked synthetic file (like empty bins)
+masked_bins = [0, 5, 13, 23]
+
+#-------------------------------------------------------------------------------
+
+@pytest.fixture(scope="module", params=[(), masked_bins], ids=["full", "masked"])
+def synthetic_file(request, tmp_path_factory):
+  """ Small synthetic validation file with two dimensions, with all bins of
+      the grid or without the masked bins (fewer bins than CoordNBins).
+  """
+  work_dir = tmp_path_factory.mktemp("synthetic")
+  return BMSD.write_validation_file(str(work_dir / BMSD.file_name()), n_bins=(6,4), n_steps=2, masked_bins=request.param)
+
+@pytest.fixture(scope="module")
+def reference(synthetic_file):
+  """ Bin contents and deltas parsed from the CSV text in double precision,
+      without the reader.
+  """
+  with open(synthetic_file) as in_file:
+    lines = in_file.read().splitlines()
+  header_line = lines.index(CMR.CSVMetadataReader.end_marker) + 1
+  columns = lines[header_line].split(",")
+  values = np.array([[float(value) for value in line.split(",")] for line in lines[header_line+1:]])
+  positions = { name: i for i, name in enumerate(columns) }
+  n_bins = sum(column.startswith("C") for column in columns)
+  return {
+    "C": values[:,[positions["C{}".format(b)] for b in range(n_bins)]],
+    "P": values[:,[positions["P{}".format(b)] for b in range(n_bins)]],
+    "Deltas": values[:,[positions["Delta-c"], positions["Delta-w"]]],
+    "Delta": IOR.Reader(synthetic_file)["Delta"] }
+
+def selections(deltas, delta):
+  """ Points used for each direction by the chi-squared test.
+  """
+  labels, _ = VMDD.classify(deltas, 1e-6 * abs(delta))
+  d_max = VTCSC.d_max_factor * delta
+  return np.logical_and(VMDD.selection_matrix(labels), VMDH.delta_metric(deltas) <= d_max)
+
+def reference_chi_squared(reference):
+  """ chi^2_shift and chi^2_mismodel of each (direction, row), summed bin by
+      bin: bins without cut events and bins that are the same for all points
+      of the direction don't contribute.
+  """
+  C, P, deltas = reference["C"], reference["P"], reference["Deltas"]
+  row_cut0 = np.flatnonzero(np.all(deltas == 0, axis=1))[0]
+  N_cut_cut0 = C[row_cut0]
+  chi_squared = {}
+  for i_dir, dir_selection in enumerate(selections(deltas, reference["Delta"])):
+    rows = np.flatnonzero(dir_selection)
+    for row in rows:
+      chi_sq_c0, chi_sq_pc = 0.0, 0.0
+      for b in range(C.shape[1]):
+        if not C[row,b] > 0 or np.all(C[rows,b] == N_cut_cut0[b]):
+          continue
+        chi_sq_c0 += (C[row,b] - N_cut_cut0[b])**2 / N_cut_cut0[b]
+        chi_sq_pc += (P[row,b] - C[row,b])**2 / C[row,b]
+      chi_squared[(i_dir, row)] = (chi_sq_c0, chi_sq_pc)
+  return chi_squared
+
+def assert_chi_squared_close(results, expected, rtol):
+  """ Compare chi-squared results (see ValidityMeasures/ChiSquared) to the
+      reference values of each (direction, row).
+  """
+  assert sorted(zip(results["direction"], results["row"])) == sorted(expected)
+  expected_values = np.array([expected[(i_dir, row)] for i_dir, row in zip(results["direction"], results["row"])])
+  np.testing.assert_allclose(results["chi_sq_c0"], expected_values[:,0], rtol=rtol)
+  np.testing.assert_allclose(results["chi_sq_pc"], expected_values[:,1], rtol=rtol)
+
+#-------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("bin_storage", list(IOR.bin_storages))
+def test_bin_contents(synthetic_file, reference, bin_storage):
+  """ The stored bin contents have the storage type and reproduce the double
+      precision values, the cut contents (event counts) exactly.
+  """
+  reader = IOR.Reader(synthetic_file, bin_storage=bin_storage)
+  assert (reader["C"].dtype, reader["P"].dtype) == bin_dtypes[bin_storage]
+  assert reader["Deltas"].dtype == np.float64
+  np.testing.assert_array_equal(reader["C"], reference["C"])
+  np.testing.assert_allclose(reader["P"], reference["P"], rtol=bin_rtol[bin_storage])
+  np.testing.assert_array_equal(reader["Deltas"], reference["Deltas"])
+
+@pytest.mark.parametrize("bin_storage", list(IOR.bin_storages))
+def test_chi_squared(synthetic_file, reference, bin_storage):
+  """ The chi-squared values of the full evaluation agree with the reference.
+  """
+  reader = IOR.Reader(synthetic_file, bin_storage=bin_storage)
+  C, P, deltas = reader["C"], reader["P"], reader["Deltas"]
+  results = VMCS.chi_squared_test(C, P, C[reader.cut0_row()], deltas, selections(deltas, reader["Delta"]))
+  assert results["chi_sq_c0"].dtype == np.float64
+  assert_chi_squared_close(results, reference_chi_squared(reference), chi_squared_rtol[bin_storage])
+
+@pytest.mark.parametrize("bin_storage", list(IOR.bin_storages))
+def test_chunked_chi_squared(synthetic_file, reference, bin_storage):
+  """ The chi-squared values of the chunked evaluation agree with the
+      reference.
+  """
+  reader = IOR.ChunkedReader(synthetic_file, chunk_rows=7, bin_storage=bin_storage)
+  results, _, _ = VTS.streaming_test(reader, VTCSC.d_max_factor * reader["Delta"], 1.0)
+  assert_chi_squared_close(results, reference_chi_squared(reference), chi_squared_rtol[bin_storage])
+
+@pytest.mark.parametrize("bin_storage", list(IOR.bin_storages))
+def test_cache_keeps_storage(tmp_path, synthetic_file, bin_storage):
+  """ Reading from the cache gives the same arrays (and types) as parsing.
+  """
+  file_path = str(tmp_path / BMSD.file_name())
+  with open(synthetic_file) as in_file, open(file_path, "w") as out_file:
+    out_file.write(in_file.read())
+  parsed = IOR.Reader(file_path, use_cache=True, bin_storage=bin_storage)
+  cached = IOR.Reader(file_path, use_cache=True, bin_storage=bin_storage)
+  assert "DataBlocks" in cached.data
+  for name in ["C", "P", "Deltas", "RowIndex"]:
+    assert cached[name].dtype == parsed[name].dtype
+    np.testing.assert_array_equal(cached[name], parsed[name])
+
+def test_bin_count(synthetic_file):
+  """ The bins are those of the bin centers, also if bins of the grid are
+      left out of the file.
+  """
+  reader = IOR.Reader(synthetic_file)
+  n_bins = len(reader["BinCenters"])
+  assert reader["C"].shape[1] == reader["P"].shape[1] == n_bins
+  for chunk in IOR.ChunkedReader(synthetic_file, chunk_rows=7).chunks():
+    assert chunk["C"].shape[1] == chunk["P"].shape[1] == n_bins
+
+def test_bins_must_match_metadata(tmp_path):
+  """ Reading a file whose bin columns don't match its bin centers fails.
+  """
+  full_path = BMSD.write_validation_file(str(tmp_path / "full.csv"), n_bins=(6,4), n_steps=2)
+  masked_path = BMSD.write_validation_file(str(tmp_path / "masked.csv"), n_bins=(6,4), n_steps=2, masked_bins=masked_bins)
+  with open(full_path) as in_file:
+    lines = in_file.read().splitlines()
+  with open(masked_path) as in_file:
+    masked_centers = [line for line in in_file.read().splitlines() if line.startswith("BinCenters:")][0]
+  lines = [masked_centers if line.startswith("BinCenters:") else line for line in lines]
+  file_path = str(tmp_path / BMSD.file_name())
+  with open(file_path, "w") as out_file:
+    out_file.write("\n".join(lines) + "\n")
+
+  with pytest.raises(ValueError, match="BinCenters"):
+    IOR.Reader(file_path)
+  with pytest.raises(ValueError, match="BinCenters"):
+    list(IOR.ChunkedReader(file_path).chunks())
+
+def test_integer_storage_needs_counts(tmp_path, synthetic_file):
+  """ Non-integer cut bin contents can't be stored as integers.
+  """
+  with open(synthetic_file) as in_file:
+    lines = in_file.read().splitlines()
+  first_row = lines.index(CMR.CSVMetadataReader.end_marker) + 2
+  cells = lines[first_row].split(",")
+  cells[2] = "{}.5".format(cells[2].split(".")[0])
+  lines[first_row] = ",".join(cells)
+  file_path = str(tmp_path / BMSD.file_name())
+  with open(file_path, "w") as out_file:
+    out_file.write("\n".join(lines) + "\n")
+
+  with pytest.raises(ValueError):
+    IOR.Reader(file_path, bin_storage="integer")
+  with pytest.raises(ValueError):
+    list(IOR.ChunkedReader(file_path, bin_storage="integer").chunks())
+  assert IOR.Reader(file_path, bin_storage="float32")["C"].dtype == np.float32
+
+#-------------------------------------------------------------------------------